@@ -1,18 +1,25 @@
-from fastapi import APIRouter
+from fastapi import FastAPI
 
-from app.api import users, tasks, priorities
-from app.core.versioning import get_api_router
+from app.api import users, tasks, priorities, admin
+from app.core.versioning import api_versions
 
-# Create API router (legacy non-versioned)
-api_router = APIRouter()
+# Route modules and their OpenAPI tags
+api_routers = [
+    (users.router, ["users"]),
+    (tasks.router, ["tasks"]),
+    (priorities.router, ["priorities"]),
+    (admin.router, ["admin"]),
+]
 
-# Include routes from other modules in legacy router
-api_router.include_router(users.router, prefix="/api", tags=["users"])
-api_router.include_router(tasks.router, prefix="/api", tags=["tasks"])
-api_router.include_router(priorities.router, prefix="/api", tags=["priorities"])
-
-# Include routes in versioned API router (v1)
-v1_router = get_api_router("v1")
-v1_router.include_router(users.router, tags=["users"])
-v1_router.include_router(tasks.router, tags=["tasks"])
-v1_router.include_router(priorities.router, tags=["priorities"])
+def include_api_routers(app: FastAPI) -> None:
+    """
+    Mount the route modules on the app under every API version prefix
+    (e.g. /api/v1) and under the legacy non-versioned /api prefix.
+    Routers are included straight into the app rather than through
+    intermediate routers, since each level of nesting rebuilds every route.
+    :param app: FastAPI application
+    """
+    prefixes = [router.prefix for router in api_versions.values()] + ["/api"]
+    for prefix in prefixes:
+        for router, tags in api_routers:
+            app.include_router(router, prefix=prefix, tags=tags)
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import List
+
+from app.core.auth import get_current_admin_user
+from app.core.loop_monitor import loop_monitor
+from app.core.memory import memory_tracer
+from app.core.profiling import get_profile_path, list_profiles
+from app.models import User
+from app.schemas import LoopStall, MemoryReport, ProfileInfo, TracemallocStatus
+
+router = APIRouter()
+
+# GET /admin/profiles - List captured request profiles
+@router.get("/admin/profiles", response_model=List[ProfileInfo])
+async def get_profiles(current_user: User = Depends(get_current_admin_user)):
+    """
+    List request profiles captured with the X-Profile header, newest first.
+    """
+    return list_profiles()
+
+# GET /admin/profiles/{name} - Download a captured profile
+@router.get("/admin/profiles/{name}")
+async def get_profile(name: str, current_user: User = Depends(get_current_admin_user)):
+    """
+    Download a profile in the folded stack format, e.g. for flamegraph.pl
+    or speedscope.
+    """
+    path = get_profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+# GET /admin/loop-stalls - List recent event loop stalls
+@router.get("/admin/loop-stalls", response_model=List[LoopStall])
+async def get_loop_stalls(current_user: User = Depends(get_current_admin_user)):
+    """
+    List the most recent times the event loop was blocked past the lag
+    threshold, with the blocking stack and the route being served.
+    """
+    return list(reversed(loop_monitor.stalls))
+
+# POST /admin/memory/start - Start tracing allocations
+@router.post("/admin/memory/start", response_model=TracemallocStatus)
+async def start_memory_tracing(frames: int = 1, current_user: User = Depends(get_current_admin_user)):
+    """
+    Start tracemalloc and take the baseline snapshot.
+    Tracing slows allocations down; stop it when done.
+    """
+    memory_tracer.start(frames)
+    return {"tracing": memory_tracer.tracing}
+
+# POST /admin/memory/stop - Stop tracing allocations
+@router.post("/admin/memory/stop", response_model=TracemallocStatus)
+async def stop_memory_tracing(current_user: User = Depends(get_current_admin_user)):
+    """
+    Stop tracemalloc and drop the stored snapshot.
+    """
+    memory_tracer.stop()
+    return {"tracing": memory_tracer.tracing}
+
+# GET /admin/memory/report - Diff allocations since the last snapshot
+@router.get("/admin/memory/report", response_model=MemoryReport)
+async def get_memory_report(top: int = 20, current_user: User = Depends(get_current_admin_user)):
+    """
+    Take a snapshot and report the modules and allocation sites that grew
+    most since the previous snapshot.
+    """
+    if not memory_tracer.tracing:
+        raise HTTPException(status_code=409, detail="Memory tracing is not running")
+    return memory_tracer.report(top)
@@ -1,25 +1,59 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List
+import os
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, shard_router
 from app.core.auth import get_current_active_user
+from app.core.cache import TTLCache
+from app.core.responses import NegotiatedRoute
 from app.models import Priority, User
 from app.schemas import Priority as PrioritySchema, PriorityCreate
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
+
+# Priorities rarely change, so the list is cached in process. Other workers
+# see a new priority once their copy expires.
+PRIORITY_CACHE_TTL_SECONDS = float(os.getenv("PRIORITY_CACHE_TTL_SECONDS", "300"))
+priority_cache = TTLCache("priorities", max_size=1, ttl=PRIORITY_CACHE_TTL_SECONDS)
+
+def load_priorities(db: Session) -> List[Dict]:
+    """
+    Get all priorities, serving from the priority cache when possible
+    :param db: Database session
+    :return: Priorities as dicts
+    """
+    priorities = priority_cache.get("all")
+    if priorities is None:
+        priorities = [PrioritySchema.from_orm(priority).dict() for priority in db.query(Priority).all()]
+        priority_cache.set("all", priorities)
+    return priorities
+
+def sync_priorities_to_shards(db: Session) -> None:
+    """
+    Copy the priorities table to every task shard, where task queries join it
+    :param db: Session on the primary database
+    """
+    priorities = db.query(Priority).all()
+    for shard_sessions in shard_router.sessions.values():
+        shard_db = shard_sessions()
+        try:
+            for priority in priorities:
+                shard_db.merge(Priority(id=priority.id, name=priority.name, weight=priority.weight))
+            shard_db.commit()
+        finally:
+            shard_db.close()
 
 # GET /priorities - Get all priorities
 @router.get("/priorities", response_model=List[PrioritySchema])
 async def get_priorities(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all available task priorities.
     """
-    priorities = db.query(Priority).all()
-    return priorities
+    return load_priorities(db)
 
 # POST /priorities - Create a new priority (admin only in a real app)
 @router.post("/priorities", response_model=PrioritySchema, status_code=status.HTTP_201_CREATED)
@@ -46,6 +80,8 @@ async def create_priority(
     db.add(db_priority)
     db.commit()
     db.refresh(db_priority)
+    priority_cache.invalidate("all")
+    sync_priorities_to_shards(db)
     
     return db_priority
 
@@ -53,7 +89,7 @@ async def create_priority(
 @router.get("/priorities/{priority_id}", response_model=PrioritySchema)
 async def get_priority(
     priority_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
-import httpx
+from functools import partial
+import time
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, shard_session
+from app.core import group_commit
+from app.core.group_commit import group_commit_writer
 from app.core.auth import get_current_active_user
-from app.models import Task, User, Priority, TaskDependency
+from app.core.logging_config import logger
+from app.core.metrics import ai_scoring_duration_seconds, ai_scoring_failures_total
+from app.core import responses
+from app.core.responses import NegotiatedRoute, negotiated_response_class
+from app.models import ArchivedTask, Task, User, Priority, TaskDependency
 from app.schemas import (
     Task as TaskSchema,
     TaskCreate, 
@@ -16,45 +24,177 @@ from app.schemas import (
 )
 from app.ai.prioritization import TaskData
 
-router = APIRouter()
+router = APIRouter(route_class=NegotiatedRoute)
 
 # AI Prioritization Service URL
 AI_SERVICE_URL = "http://localhost:8001/prioritize_task"
 
+# Task sessions are on the current user's shard when sharding is configured
+def get_task_db(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    yield from shard_session(current_user.id, db)
+
+def get_task_read_db(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_read_db)):
+    yield from shard_session(current_user.id, db)
+
+async def _request_ai_score(task_data: TaskData) -> Optional[float]:
+    """
+    Ask the AI prioritization service to score a task, recording its latency
+    and failures. Failures are logged and return None so the caller can
+    carry on without a score.
+    """
+    # Imported here: httpx is only needed once a task is scored and is slow to import
+    import httpx
+
+    start_time = time.perf_counter()
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(AI_SERVICE_URL, json=task_data.dict())
+        if response.status_code != 200:
+            ai_scoring_failures_total.inc()
+            logger.warning(f"AI prioritization service returned status {response.status_code}")
+            return None
+        ai_priority_score = response.json().get("score")
+        logger.debug(f"AI Priority Score: {ai_priority_score}")
+        return ai_priority_score
+    except Exception as e:
+        ai_scoring_failures_total.inc()
+        logger.warning(f"Error calling AI prioritization service: {str(e)}")
+        return None
+    finally:
+        ai_scoring_duration_seconds.observe(time.perf_counter() - start_time)
+
+# Columns selected by the row-based fast path, in TaskSchema field order
+_TASK_COLUMNS = ("title", "description", "status", "priority_id", "due_date",
+                 "id", "owner_id", "created_at", "updated_at")
+_PRIORITY_COLUMNS = [
+    Priority.__table__.c.name.label("priority_name"),
+    Priority.__table__.c.weight.label("priority_weight"),
+    Priority.__table__.c.id.label("priority_ref"),
+]
+_TASK_LIST_COLUMNS = [Task.__table__.c[name] for name in _TASK_COLUMNS] + _PRIORITY_COLUMNS
+_ARCHIVED_TASK_LIST_COLUMNS = [ArchivedTask.__table__.c[name] for name in _TASK_COLUMNS] + _PRIORITY_COLUMNS
+
+def _task_rows_to_dicts(rows) -> List[dict]:
+    """Build TaskSchema-shaped dicts straight from Core rows"""
+    results = []
+    append = results.append
+    for row in rows:
+        task = dict(zip(_TASK_COLUMNS, row[:9]))
+        task["priority"] = (
+            {"name": row[9], "weight": row[10], "id": row[11]} if row[11] is not None else None
+        )
+        append(task)
+    return results
+
+# Hot queries as lambda statements. The statement is built, and its cache key
+# computed, once per call site and model; later calls only pull the bound
+# parameters out of the lambdas' closures and reuse the compiled SQL.
+def _owned_task_stmt(model, task_id: int, owner_id: int, with_priority: bool = False):
+    """Task (or archived task) by ID, if it belongs to the owner"""
+    stmt = lambda_stmt(lambda: select(model))
+    if with_priority:
+        stmt += lambda s: s.options(joinedload(model.priority))
+    stmt += lambda s: s.where(model.id == task_id, model.owner_id == owner_id)
+    return stmt
+
+def _priority_stmt(priority_id: int):
+    """Priority by ID"""
+    return lambda_stmt(lambda: select(Priority).where(Priority.id == priority_id))
+
+def _filter_task_list(stmt, model, owner_id: int, status: Optional[str], priority_id: Optional[int]):
+    """Add the owner, status and priority filters of GET /tasks"""
+    stmt += lambda s: s.where(model.owner_id == owner_id)
+    if status:
+        stmt += lambda s: s.where(model.status == status)
+    if priority_id:
+        stmt += lambda s: s.where(model.priority_id == priority_id)
+    return stmt
+
+def _task_list_stmt(model, owner_id: int, status: Optional[str], priority_id: Optional[int]):
+    """A user's tasks (or archived tasks) with their priority"""
+    stmt = lambda_stmt(lambda: select(model).options(joinedload(model.priority)))
+    return _filter_task_list(stmt, model, owner_id, status, priority_id)
+
+def _task_list_rows_stmt(model, columns, owner_id: int, status: Optional[str], priority_id: Optional[int]):
+    """Fast path rows of a user's tasks (or archived tasks); columns go with the model"""
+    stmt = lambda_stmt(
+        lambda: select(*columns).outerjoin(Priority, Priority.id == model.priority_id),
+        track_on=[model],
+    )
+    return _filter_task_list(stmt, model, owner_id, status, priority_id)
+
+def _dependency_stmt(task_id: int, dependent_task_id: int):
+    """Dependency of dependent_task_id on task_id"""
+    return lambda_stmt(lambda: select(TaskDependency).where(
+        TaskDependency.task_id == task_id,
+        TaskDependency.dependent_task_id == dependent_task_id
+    ))
+
+def _dependencies_stmt(task_id: int):
+    """Tasks that task_id depends on, with their priority"""
+    return lambda_stmt(lambda: select(Task).options(joinedload(Task.priority)).join(
+        TaskDependency, TaskDependency.task_id == Task.id
+    ).where(TaskDependency.dependent_task_id == task_id))
+
+def _insert_task(values: dict, db: Session) -> TaskSchema:
+    """Group commit job: insert a new task (a new row each run, as a batch may be rerun)"""
+    db_task = Task(**values)
+    db.add(db_task)
+    db.flush()
+    return TaskSchema.from_orm(db_task)
+
+def _apply_task_update(task_id: int, owner_id: int, update_data: dict, db: Session) -> TaskSchema:
+    """Group commit job: apply an update to a task, if it still exists"""
+    db_task = db.scalars(_owned_task_stmt(Task, task_id, owner_id)).first()
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    for key, value in update_data.items():
+        setattr(db_task, key, value)
+    db_task.updated_at = datetime.utcnow()
+    db.flush()
+    return TaskSchema.from_orm(db_task)
+
 # GET /tasks - Get all tasks for the current user
 @router.get("/tasks", response_model=List[TaskSchema])
 async def get_tasks(
+    request: Request,
     status: Optional[str] = None, 
     priority_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    include_archived: bool = False,
+    db: Session = Depends(get_task_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all tasks for the current user.
-    Optionally filter by status or priority.
+    Optionally filter by status or priority, and include archived tasks
+    after the live ones.
     """
-    query = db.query(Task).filter(Task.owner_id == current_user.id)
-    
-    if status:
-        query = query.filter(Task.status == status)
-    
-    if priority_id:
-        query = query.filter(Task.priority_id == priority_id)
+    models = (Task, ArchivedTask) if include_archived else (Task,)
+    if responses.FAST_JSON_RESPONSES:
+        # Fast path: plain rows, no identity map or per-object validation
+        rows = []
+        for model, columns in zip(models, (_TASK_LIST_COLUMNS, _ARCHIVED_TASK_LIST_COLUMNS)):
+            rows.extend(db.execute(_task_list_rows_stmt(model, columns, current_user.id, status, priority_id)))
+        response_class = negotiated_response_class(request)
+        return response_class(_task_rows_to_dicts(rows))
     
-    return query.all()
+    results = []
+    for model in models:
+        results.extend(db.scalars(_task_list_stmt(model, current_user.id, status, priority_id)).all())
+    return results
 
 # POST /tasks - Create a new task
 @router.post("/tasks", response_model=TaskSchema, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: TaskCreate, 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create a new task and get AI-based priority recommendation.
     """
     # Verify the priority exists
-    priority = db.query(Priority).filter(Priority.id == task.priority_id).first()
+    priority = db.scalars(_priority_stmt(task.priority_id)).first()
     if not priority:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,25 +212,20 @@ async def create_task(
     )
     
     # Try to get AI priority recommendation
-    ai_priority_score = None
-    try:
-        # Prepare task data for AI service
-        task_data = TaskData(
-            title=task.title,
-            description=task.description or "",
-            priority_id=task.priority_id,
-            due_date=task.due_date.isoformat() if task.due_date else None
-        )
-        
-        # Call AI service
-        async with httpx.AsyncClient() as client:
-            response = await client.post(AI_SERVICE_URL, json=task_data.dict())
-            if response.status_code == 200:
-                ai_priority_score = response.json().get("score")
-                print(f"AI Priority Score: {ai_priority_score}")
-    except Exception as e:
-        print(f"Error calling AI prioritization service: {str(e)}")
-        # Continue with task creation even if AI service fails
+    # (task creation continues even if the AI service fails)
+    task_data = TaskData(
+        title=task.title,
+        description=task.description or "",
+        priority_id=task.priority_id,
+        due_date=task.due_date.isoformat() if task.due_date else None
+    )
+    await _request_ai_score(task_data)
+    
+    if group_commit.GROUP_COMMIT_ENABLED:
+        # Committed together with other requests' writes
+        values = {column: getattr(db_task, column)
+                  for column in ("title", "description", "status", "priority_id", "owner_id", "due_date")}
+        return await group_commit_writer(db).submit(partial(_insert_task, values))
     
     # Save the task
     db.add(db_task)
@@ -102,14 +237,17 @@ async def create_task(
 # GET /tasks/{task_id} - Get a specific task
 @router.get("/tasks/{task_id}", response_model=TaskSchema)
 async def get_task(
-    task_id: int, 
-    db: Session = Depends(get_db),
+    task_id: int,
+    include_archived: bool = False,
+    db: Session = Depends(get_task_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get details of a specific task.
+    Get details of a specific task, or of an archived task with include_archived.
     """
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id, with_priority=True)).first()
+    if task is None and include_archived:
+        task = db.scalars(_owned_task_stmt(ArchivedTask, task_id, current_user.id, with_priority=True)).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -119,13 +257,13 @@ async def get_task(
 async def update_task(
     task_id: int, 
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update a specific task.
     """
-    db_task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    db_task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id)).first()
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -134,7 +272,7 @@ async def update_task(
     
     # Verify priority exists if changing
     if "priority_id" in update_data and update_data["priority_id"] is not None:
-        priority = db.query(Priority).filter(Priority.id == update_data["priority_id"]).first()
+        priority = db.scalars(_priority_stmt(update_data["priority_id"])).first()
         if not priority:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -146,27 +284,25 @@ async def update_task(
         setattr(db_task, key, value)
     
     # Set updated_at timestamp
-    db_task.updated_at = datetime.now()
+    db_task.updated_at = datetime.utcnow()
     
     # Try to get AI priority recommendation
     if "title" in update_data or "description" in update_data or "due_date" in update_data:
-        try:
-            # Prepare task data for AI service
-            task_data = TaskData(
-                title=db_task.title,
-                description=db_task.description or "",
-                priority_id=db_task.priority_id,
-                due_date=db_task.due_date.isoformat() if db_task.due_date else None
-            )
-            
-            # Call AI service
-            async with httpx.AsyncClient() as client:
-                response = await client.post(AI_SERVICE_URL, json=task_data.dict())
-                if response.status_code == 200:
-                    ai_priority_score = response.json().get("score")
-                    print(f"AI Priority Score: {ai_priority_score}")
-        except Exception as e:
-            print(f"Error calling AI prioritization service: {str(e)}")
+        task_data = TaskData(
+            title=db_task.title,
+            description=db_task.description or "",
+            priority_id=db_task.priority_id,
+            due_date=db_task.due_date.isoformat() if db_task.due_date else None
+        )
+        await _request_ai_score(task_data)
+    
+    if group_commit.GROUP_COMMIT_ENABLED:
+        # Discard the changes made here: the group commit writer applies
+        # them in its own transaction, together with other requests' writes
+        db.rollback()
+        return await group_commit_writer(db).submit(
+            partial(_apply_task_update, task_id, current_user.id, update_data)
+        )
     
     # Save the changes
     db.commit()
@@ -178,13 +314,13 @@ async def update_task(
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete a specific task.
     """
-    db_task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    db_task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id)).first()
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -204,15 +340,15 @@ async def delete_task(
 async def add_task_dependency(
     task_id: int,
     dependency: TaskDependencyCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Add a dependency between tasks.
     """
     # Check that both tasks exist and belong to the current user
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
-    dependent_task = db.query(Task).filter(Task.id == dependency.dependent_task_id, Task.owner_id == current_user.id).first()
+    task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id)).first()
+    dependent_task = db.scalars(_owned_task_stmt(Task, dependency.dependent_task_id, current_user.id)).first()
     
     if task is None or dependent_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -222,10 +358,7 @@ async def add_task_dependency(
         raise HTTPException(status_code=400, detail="Cannot create circular dependency with the same task")
     
     # Check if dependency already exists
-    existing_dependency = db.query(TaskDependency).filter(
-        TaskDependency.task_id == task_id,
-        TaskDependency.dependent_task_id == dependency.dependent_task_id
-    ).first()
+    existing_dependency = db.scalars(_dependency_stmt(task_id, dependency.dependent_task_id)).first()
     
     if existing_dependency:
         raise HTTPException(status_code=400, detail="Dependency already exists")
@@ -246,23 +379,19 @@ async def add_task_dependency(
 @router.get("/tasks/{task_id}/dependencies", response_model=List[TaskSchema])
 async def get_task_dependencies(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all tasks that the specified task depends on.
     """
     # Check task exists and belongs to user
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id)).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Get dependencies
-    dependencies = db.query(Task).join(
-        TaskDependency, TaskDependency.task_id == Task.id
-    ).filter(
-        TaskDependency.dependent_task_id == task_id
-    ).all()
+    dependencies = db.scalars(_dependencies_stmt(task_id)).all()
     
     return dependencies
 
@@ -271,22 +400,19 @@ async def get_task_dependencies(
 async def remove_task_dependency(
     task_id: int,
     dependency_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_task_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Remove a dependency between tasks.
     """
     # Check task exists and belongs to user
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    task = db.scalars(_owned_task_stmt(Task, task_id, current_user.id)).first()
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Get the dependency
-    dependency = db.query(TaskDependency).filter(
-        TaskDependency.task_id == task_id,
-        TaskDependency.dependent_task_id == dependency_id
-    ).first()
+    dependency = db.scalars(_dependency_stmt(task_id, dependency_id)).first()
     
     if dependency is None:
         raise HTTPException(status_code=404, detail="Dependency not found")
@@ -1,19 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
 from app.core.auth import (
     authenticate_user,
     create_access_token,
-    get_password_hash,
+    create_refresh_token,
+    decode_access_token,
+    revoke_token,
+    oauth2_scheme,
+    get_user_by_username,
+    get_password_hash_async,
     get_current_active_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    invalidate_cached_user,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    SECRET_KEY,
+    ALGORITHM
 )
+from app.core.revocation import revocation_list
 from app.models import User
-from app.schemas import User as UserSchema, UserCreate, UserUpdate, Token
+from app.schemas import User as UserSchema, UserCreate, UserUpdate, Token, TokenRefresh
 
 router = APIRouter()
 
@@ -26,7 +36,7 @@ async def login_for_access_token(
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,8 +49,73 @@ async def login_for_access_token(
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
+    refresh_token = create_refresh_token(data={"sub": user.username})
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+# POST /token/refresh - Exchange a refresh token for new tokens
+@router.post("/token/refresh", response_model=Token)
+async def refresh_access_token(
+    token_refresh: TokenRefresh,
+    db: Session = Depends(get_db)
+):
+    """
+    Issue a new access token and rotate the refresh token.
+    The presented refresh token is revoked and cannot be used again.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        claims = jwt.decode(token_refresh.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if claims.get("type") != "refresh" or revocation_list.is_revoked(claims.get("jti"), db):
+        raise credentials_exception
+    
+    user = get_user_by_username(db, claims.get("sub"))
+    if user is None:
+        raise credentials_exception
+    
+    # Revoking in the database is the real check: a token already exchanged
+    # on another worker, or by a concurrent request, is refused here
+    if not revoke_token(db, claims):
+        raise credentials_exception
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username}, expires_delta=access_token_expires
+    )
+    refresh_token = create_refresh_token(data={"sub": user.username})
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+# POST /logout - Revoke the current access token
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_refresh: Optional[TokenRefresh] = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Revoke the access token used for this request, and the refresh token
+    if one is supplied.
+    """
+    revoke_token(db, decode_access_token(token))
+    
+    if token_refresh is not None:
+        try:
+            claims = jwt.decode(token_refresh.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            claims = None
+        if claims and claims.get("type") == "refresh" and claims.get("sub") == current_user.username:
+            if not revocation_list.is_revoked(claims.get("jti"), db):
+                # Returns False if another request revoked it meanwhile, which is fine here
+                revoke_token(db, claims)
+    
+    return None
 
 # POST /users - Create a new user
 @router.post("/users", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
@@ -60,7 +135,7 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user with hashed password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -106,5 +181,6 @@ async def update_user(
     
     db.commit()
     db.refresh(current_user)
+    invalidate_cached_user(current_user.username)
     
     return current_user
@@ -0,0 +1,125 @@
+"""Background archival of completed tasks"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import List
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.engine import Engine
+
+from app.core.database import engine as primary_engine, shard_router
+from app.core.logging_config import logger
+from app.core.metrics import Counter
+from app.models import ArchivedTask, ArchivedTaskDependency, Task, TaskDependency
+
+# Load environment variables
+load_dotenv()
+
+# Opt-in, and to be enabled on one process only: runners on several
+# workers would race to archive the same tasks
+ARCHIVAL_ENABLED = os.getenv("ARCHIVAL_ENABLED", "false").lower() == "true"
+# Completed tasks untouched for this many days are archived
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# Tasks moved per transaction, which bounds how long each one holds locks
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+tasks_archived_total = Counter("tasks_archived_total", "Completed tasks moved to the archive table")
+
+tasks = Task.__table__
+dependencies = TaskDependency.__table__
+archived_tasks = ArchivedTask.__table__
+archived_dependencies = ArchivedTaskDependency.__table__
+
+# Columns copied to the archive, which keeps each task's ID
+_TASK_COLUMNS = ["id", "title", "description", "status", "owner_id", "priority_id",
+                 "created_at", "updated_at", "due_date"]
+
+# A database created before tasks used AUTOINCREMENT can have handed an
+# archived task's ID to a new task; such tasks are left live, not archived
+_id_archived = select(archived_tasks.c.id).where(archived_tasks.c.id == tasks.c.id).exists()
+
+
+def _due(cutoff: datetime):
+    return and_(tasks.c.status == "completed", func.coalesce(tasks.c.updated_at, tasks.c.created_at) < cutoff)
+
+
+def archive_batch(engine: Engine, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move one batch of tasks completed before the cutoff, and every
+    dependency involving them, to the archive tables in one transaction.
+    Tasks whose ID is already in the archive are skipped
+    :param engine: Engine of the database holding the tasks
+    :param cutoff: Tasks last updated (or created, if never updated) before this are archived
+    :param batch_size: Most tasks moved
+    :return: Number of tasks archived
+    """
+    with engine.begin() as connection:
+        task_ids = connection.execute(
+            select(tasks.c.id)
+            .where(_due(cutoff), ~_id_archived)
+            .order_by(tasks.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not task_ids:
+            return 0
+
+        connection.execute(insert(archived_tasks).from_select(
+            _TASK_COLUMNS, select(*(tasks.c[name] for name in _TASK_COLUMNS)).where(tasks.c.id.in_(task_ids))
+        ))
+        involved = or_(dependencies.c.task_id.in_(task_ids), dependencies.c.dependent_task_id.in_(task_ids))
+        connection.execute(insert(archived_dependencies).from_select(
+            ["task_id", "dependent_task_id"],
+            select(dependencies.c.task_id, dependencies.c.dependent_task_id).where(involved)
+        ))
+        connection.execute(delete(dependencies).where(involved))
+        connection.execute(delete(tasks).where(tasks.c.id.in_(task_ids)))
+    return len(task_ids)
+
+
+def archive_completed_tasks(engine: Engine, days: int = ARCHIVE_AFTER_DAYS,
+                            batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Archive every task completed more than the given number of days ago,
+    one batch per transaction
+    :param engine: Engine of the database holding the tasks
+    :param days: Age in days after which completed tasks are archived
+    :param batch_size: Tasks moved per transaction
+    :return: Number of tasks archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    total = 0
+    while True:
+        archived = archive_batch(engine, cutoff, batch_size)
+        total += archived
+        tasks_archived_total.inc(archived)
+        if archived < batch_size:
+            break
+    with engine.connect() as connection:
+        colliding = connection.execute(
+            select(func.count()).select_from(tasks).where(_due(cutoff), _id_archived)
+        ).scalar()
+    if colliding:
+        logger.warning(f"{colliding} completed tasks not archived: their IDs were reused from archived tasks")
+    return total
+
+
+def _task_engines() -> List[Engine]:
+    # With sharding, tasks live only on the shards
+    return list(shard_router.engines.values()) or [primary_engine]
+
+
+async def run_archival(interval: float = ARCHIVE_INTERVAL_SECONDS) -> None:
+    """Periodically archive old completed tasks on every database holding tasks"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        for engine in _task_engines():
+            try:
+                archived = await loop.run_in_executor(None, archive_completed_tasks, engine)
+                if archived:
+                    logger.info(f"Archived {archived} completed tasks")
+            except Exception as e:
+                logger.warning(f"Task archival failed: {str(e)}")
@@ -1,12 +1,20 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.models import User
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models import User, RevokedToken
+from app.core.cache import TTLCache
 from app.core.database import get_db
+from app.core.revocation import revocation_list
 import os
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -18,9 +26,32 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "yoursecretkey")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
-# Password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Users allowed to use admin endpoints and diagnostics (comma-separated usernames)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
+# Cache of user column values keyed by username, so authenticated requests
+# can skip the users lookup (set USER_CACHE_SIZE=0 to disable)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+user_cache = TTLCache("users", max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Cache of verified claims keyed by a digest of the token, so reused tokens
+# skip signature verification (set TOKEN_CACHE_SIZE=0 to disable)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+token_cache = TTLCache("tokens", max_size=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+# Password context for hashing; BCRYPT_ROUNDS sets the cost factor
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Dedicated pool for bcrypt work so hashing never runs on the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -36,15 +67,49 @@ def get_password_hash(password):
     """Get the hash of a password"""
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, username: str, password: str):
+async def verify_password_async(plain_password, hashed_password):
+    """Verify a password against a hash in the password executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    """Get the hash of a password in the password executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+async def authenticate_user(db: Session, username: str, password: str):
     """Authenticate a user by username and password"""
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
+def _snapshot_user(user: User) -> dict:
+    """Copy the column values of a user so they can outlive its session"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+def _user_from_snapshot(db: Session, snapshot: dict) -> User:
+    """Attach a cached user to the session without querying the database"""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    """Get a user by username, serving from the user cache when possible"""
+    snapshot = user_cache.get(username)
+    if snapshot is not None:
+        return _user_from_snapshot(db, snapshot)
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        user_cache.set(username, _snapshot_user(user))
+    return user
+
+def invalidate_cached_user(username: str) -> None:
+    """Drop a user from the user cache after it has been modified"""
+    user_cache.invalidate(username)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -52,10 +117,92 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
+    """Create a JWT refresh token, only accepted by the refresh endpoint"""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "refresh"})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def revoke_token(db: Session, claims: dict) -> bool:
+    """
+    Revoke a token by its jti claim.
+    Takes effect immediately in this worker and in other workers on their
+    next revocation list sync. The unique jti column makes the insert an
+    atomic check: of several concurrent revocations of one token, on any
+    worker, only one succeeds.
+    :return: True if this call revoked the token, False if it was already revoked
+    """
+    jti = claims.get("jti")
+    if jti is None:
+        return True
+    db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(claims["exp"])))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        revocation_list.add(jti)
+        return False
+    revocation_list.add(jti)
+    return True
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def decode_access_token(token: str) -> dict:
+    """
+    Decode and verify a JWT access token.
+    Verified claims are cached until the token expires, so a token that is
+    presented repeatedly is only verified once.
+    """
+    key = _token_digest(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        if claims["exp"] > time.time():
+            return claims
+        token_cache.invalidate(key)
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = claims.get("exp")
+    if exp is not None:
+        token_cache.set(key, claims, ttl=min(TOKEN_CACHE_TTL_SECONDS, exp - time.time()))
+    return claims
+
+def invalidate_cached_token(token: str) -> None:
+    """Drop a token's verified claims so it is fully checked on next use"""
+    token_cache.invalidate(_token_digest(token))
+
+def get_scope_token_claims(scope) -> Optional[dict]:
+    """
+    Claims of a valid, unrevoked access token sent as a bearer token, for
+    code that runs before routing (e.g. ASGI middleware)
+    :param scope: ASGI scope of the request
+    :return: Verified claims, or None if there is no usable token
+    """
+    authorization = ""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+            break
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        claims = decode_access_token(token)
+    except JWTError:
+        return None
+    if claims.get("sub") is None or claims.get("type", "access") != "access":
+        return None
+    if revocation_list.is_revoked(claims.get("jti")):
+        return None
+    return claims
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get the current user from JWT token"""
     credentials_exception = HTTPException(
@@ -64,14 +211,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type", "access") != "access":
+            raise credentials_exception
+        if revocation_list.is_revoked(payload.get("jti"), db):
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = get_user_by_username(db, token_data.username)
     if user is None:
         raise credentials_exception
     return user
@@ -80,3 +229,12 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     """Check if the current user is active"""
     # In a real app, check if the user is active (e.g., not banned)
     return current_user
+
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    """Check that the current user is an admin (listed in ADMIN_USERNAMES)"""
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
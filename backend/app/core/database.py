@@ -1,10 +1,25 @@
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import MetaData, create_engine, event, exc, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+from starlette.types import Scope
+import asyncio
+import bisect
+import hashlib
 import os
 from dotenv import load_dotenv
 import time
 import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.logging_config import logger as app_logger
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.request_context import RequestContext, current_request
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,31 +31,273 @@ load_dotenv()
 # Get database URL from environment variable or use default SQLite URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./smarttask.db")
 
-# Create SQLAlchemy engine with connection retry logic
-def get_engine(url, max_retries=5, retry_interval=5):
-    """Create a SQLAlchemy engine with retry logic for containers"""
+# Startup connection check: attempts, and the backoff between them in seconds
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "8"))
+DB_CONNECT_BACKOFF_SECONDS = float(os.getenv("DB_CONNECT_BACKOFF_SECONDS", "0.25"))
+DB_CONNECT_MAX_BACKOFF_SECONDS = float(os.getenv("DB_CONNECT_MAX_BACKOFF_SECONDS", "5"))
+
+# Connection pool: persistent connections, extra connections allowed under
+# load, seconds to wait for a free connection, seconds after which a
+# connection is replaced (-1 never) and whether to test connections on checkout
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# Optional read replica for read-only endpoints. After a user writes, their
+# reads go to the primary for REPLICA_STICKY_SECONDS so they see their own
+# writes despite replication lag.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+# Optional task shards as comma-separated name=url pairs (e.g.
+# "shard0=postgresql://...,shard1=postgresql://..."). Tasks and their
+# dependencies live on their owner's shard; users, priorities and tokens
+# stay on DATABASE_URL.
+DATABASE_SHARD_URLS = os.getenv("DATABASE_SHARD_URLS", "")
+# Points per shard on the hash ring; more spread owners more evenly
+SHARD_VIRTUAL_NODES = int(os.getenv("SHARD_VIRTUAL_NODES", "100"))
+
+# Opt-in SQLite performance profile: WAL journaling so readers and the
+# writer do not block each other, synchronous=NORMAL (safe with WAL), a
+# memory-mapped database file, a larger page cache (negative sizes are in
+# KiB) and a busy timeout, plus a dedicated writer connection next to the
+# reader pool
+SQLITE_PERFORMANCE_PROFILE = os.getenv("SQLITE_PERFORMANCE_PROFILE", "false").lower() == "true"
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Create missing tables at startup; disable where migrations manage the schema
+DB_CREATE_TABLES = os.getenv("DB_CREATE_TABLES", "true").lower() == "true"
+
+# Statements slower than this are logged with their parameters
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.1"))
+
+# Statements a request may run; routes listed in ROUTE_QUERY_BUDGETS get
+# their own budget. Over-budget requests are logged ("warn") or fail with
+# QueryBudgetExceeded ("raise", used by the test suite).
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn")
+
+# Budgets per "METHOD /route", with the route's /api or /api/vN prefix removed
+ROUTE_QUERY_BUDGETS = {
+    # Current user (on a user cache miss), live tasks, archived tasks (with include_archived)
+    "GET /tasks": 3,
+    "GET /tasks/{task_id}": 3,
+    "GET /tasks/{task_id}/dependencies": 3,
+    "GET /priorities": 2,
+    "GET /priorities/{priority_id}": 2,
+    "GET /users/me": 1,
+}
+_API_PREFIX = re.compile(r"^/api(?:/v\d+)?")
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more SQL statements than its route allows"""
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+db_pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up waiting for a pooled connection"
+)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_checkout_timeouts_total.inc()
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start)
+
+# Create SQLAlchemy engine. Engines connect lazily, so this never blocks;
+# connect_with_retry checks the database is reachable during startup.
+def is_sqlite_file(url: str) -> bool:
+    """Whether a URL names an SQLite database file (rather than an in-memory database)"""
+    return url.startswith("sqlite") and ":memory:" not in url and url not in ("sqlite://", "sqlite:///")
+
+def get_engine(url, pool_size: Optional[int] = None, max_overflow: Optional[int] = None):
+    """
+    Create a SQLAlchemy engine with the configured pool, without connecting
+    :param url: Database URL
+    :param pool_size: Persistent connections, defaults to DB_POOL_SIZE
+    :param max_overflow: Extra connections allowed, defaults to DB_MAX_OVERFLOW
+    """
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    if url.startswith("sqlite") and not is_sqlite_file(url):
+        # In-memory SQLite databases exist per connection and cannot be pooled
+        return create_engine(url, connect_args=connect_args)
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+def pool_status(engine) -> dict:
+    """
+    Connection usage of an engine's pool
+    :param engine: Engine to inspect
+    :return: Pool size, checked out and overflow connections, and whether
+        every connection the pool may open is checked out
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": None, "checked_out": None, "overflow": None, "exhausted": False}
+    checked_out = pool.checkedout()
+    max_overflow = pool._max_overflow
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "exhausted": max_overflow >= 0 and checked_out >= pool.size() + max_overflow,
+    }
+
+def _check_connection(engine) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+async def connect_with_retry(engine, max_retries=None, initial_delay=None, max_delay=None):
+    """
+    Wait for the database to accept connections, retrying with exponential
+    backoff without blocking the event loop (e.g. while a database
+    container is still starting)
+    :param engine: Engine to check
+    :param max_retries: Attempts before giving up
+    :param initial_delay: Delay after the first failure, in seconds; doubles each attempt
+    :param max_delay: Upper bound on the delay between attempts, in seconds
+    """
+    max_retries = DB_CONNECT_RETRIES if max_retries is None else max_retries
+    delay = DB_CONNECT_BACKOFF_SECONDS if initial_delay is None else initial_delay
+    max_delay = DB_CONNECT_MAX_BACKOFF_SECONDS if max_delay is None else max_delay
+    loop = asyncio.get_running_loop()
     for attempt in range(max_retries):
         try:
-            connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
-            engine = create_engine(url, connect_args=connect_args)
-            # Test the connection
-            with engine.connect() as conn:
-                conn.execute("SELECT 1")
+            await loop.run_in_executor(None, _check_connection, engine)
             logger.info(f"Database connection established successfully")
-            return engine
+            return
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(f"Database connection attempt {attempt + 1} failed: {str(e)}")
-                logger.info(f"Retrying in {retry_interval} seconds...")
-                time.sleep(retry_interval)
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
             else:
                 logger.error(f"Failed to connect to database after {max_retries} attempts")
                 raise
 
-engine = get_engine(DATABASE_URL)
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # Run on the raw connection, so these are not counted against query budgets
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def create_engines(url, sqlite_performance: Optional[bool] = None) -> Tuple[Engine, Optional[Engine]]:
+    """
+    Create the engine for a database URL and, with the SQLite performance
+    profile, a dedicated single-connection writer engine. SQLite allows one
+    writer at a time, so writes queue for the writer connection in process
+    instead of retrying on a locked database.
+    :param url: Database URL
+    :param sqlite_performance: Use the SQLite performance profile, defaults to SQLITE_PERFORMANCE_PROFILE
+    :return: Engine (the reader pool with the profile), and the writer engine or None
+    """
+    engine = get_engine(url)
+    if sqlite_performance is None:
+        sqlite_performance = SQLITE_PERFORMANCE_PROFILE
+    if not (sqlite_performance and is_sqlite_file(url)):
+        return engine, None
+    writer_engine = get_engine(url, pool_size=1, max_overflow=0)
+    for profiled in (engine, writer_engine):
+        event.listen(profiled, "connect", _set_sqlite_pragmas)
+    return engine, writer_engine
+
+class RoutingSession(Session):
+    """
+    Session that runs writes on a separate writer engine. Once a transaction
+    has written, the rest of it stays on the writer so it reads its own
+    uncommitted changes.
+    """
+
+    def __init__(self, writer: Optional[Engine] = None, **kwargs):
+        """
+        Initialize the session
+        :param writer: Engine for writes; without one the session behaves as a plain Session
+        """
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer is not None and (self._flushing or self.info.get("wrote") or getattr(clause, "is_dml", False)):
+            self.info["wrote"] = True
+            return self.writer
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _end_write_transaction(session):
+    session.info.pop("wrote", None)
+
+engine, writer_engine = create_engines(DATABASE_URL)
+
+def _pool_stat(field: str):
+    return lambda: pool_status(engine)[field] or 0
+
+Gauge("db_pool_size", "Persistent connections the pool keeps", callback=_pool_stat("size"))
+Gauge("db_pool_checked_out", "Pooled connections currently checked out", callback=_pool_stat("checked_out"))
+Gauge("db_pool_overflow", "Connections open beyond the pool size", callback=_pool_stat("overflow"))
+
+def get_query_budget(request: RequestContext) -> int:
+    """Statement budget for a request's route"""
+    route = request.route
+    if route is None:
+        return QUERY_BUDGET
+    return ROUTE_QUERY_BUDGETS.get(f"{request.method} {_API_PREFIX.sub('', route)}", QUERY_BUDGET)
+
+# Count statements and time spent in the database for the request being
+# served, log slow statements and enforce query budgets. Registered on the
+# Engine class so every engine is covered.
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    request = current_request.get()
+    request_id = request.request_id if request is not None else None
+    if elapsed >= SLOW_QUERY_SECONDS:
+        app_logger.warning(f"Slow query ({elapsed:.3f}s): {statement} - Parameters: {parameters!r}",
+                           extra={"request_id": request_id})
+    if request is None:
+        return
+    request.db_statements += 1
+    request.db_time += elapsed
+    budget = get_query_budget(request)
+    if request.db_statements == budget + 1:
+        message = (f"Query budget exceeded: {request.method} {request.route or request.path} "
+                   f"ran more than {budget} statements")
+        if QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(message)
+        app_logger.warning(message, extra={"request_id": request_id})
 
 # Create a SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, writer=writer_engine)
 
 # Create a Base class
 Base = declarative_base()
@@ -52,3 +309,160 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Replica engine and sessions, when a replica is configured
+replica_engine = get_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine is not None else None
+)
+
+# Users who wrote recently, by username. Kept per process: a user whose
+# next read lands on another worker can still read from the replica.
+primary_sticky = TTLCache("replica_sticky", max_size=100000, ttl=REPLICA_STICKY_SECONDS)
+
+def _sticky_key(scope: Scope) -> Optional[str]:
+    # Imported here: auth imports this module
+    from app.core.auth import get_scope_token_claims
+    claims = get_scope_token_claims(scope)
+    return claims["sub"] if claims is not None else None
+
+def is_primary_sticky(scope: Scope) -> bool:
+    """Whether the request's user wrote within the sticky window"""
+    key = _sticky_key(scope)
+    return key is not None and primary_sticky.get(key) is not None
+
+# Remember which sessions wrote, and make their user's reads sticky to the
+# primary once the write commits
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["flushed"] = True
+
+def mark_primary_sticky(scope: Scope) -> None:
+    """Send the request's user's reads to the primary for the sticky window"""
+    if ReplicaSessionLocal is None:
+        return
+    key = _sticky_key(scope)
+    if key is not None:
+        primary_sticky.set(key, True)
+
+@event.listens_for(Session, "after_commit")
+def _make_writer_sticky(session):
+    if not session.info.pop("flushed", False):
+        return
+    request = current_request.get()
+    if request is not None:
+        mark_primary_sticky(request.scope)
+
+class ShardRouter:
+    """
+    Maps task owners to shards with consistent hashing. Each shard owns
+    SHARD_VIRTUAL_NODES points on a hash ring and an owner belongs to the
+    first point at or after their own hash, so adding a shard only moves
+    the owners whose hashes fall just before its points (roughly 1/N of
+    them), which scripts/rebalance_shards.py then moves.
+    """
+
+    def __init__(self, virtual_nodes: int = SHARD_VIRTUAL_NODES):
+        """
+        Initialize the router with no shards
+        :param virtual_nodes: Points per shard on the ring
+        """
+        self.virtual_nodes = virtual_nodes
+        self.engines: Dict[str, Engine] = {}
+        self.sessions: Dict[str, sessionmaker] = {}
+        self._points: List[int] = []
+        self._shards: List[str] = []
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def add_shard(self, name: str, engine: Engine) -> None:
+        """
+        Add a shard to the ring
+        :param name: Shard name; its ring points derive from it, so names must stay stable
+        :param engine: Engine for the shard's database
+        """
+        self.engines[name] = engine
+        self.sessions[name] = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        ring = list(zip(self._points, self._shards))
+        ring.extend((self._hash(f"{name}#{i}"), name) for i in range(self.virtual_nodes))
+        ring.sort()
+        self._points = [point for point, _ in ring]
+        self._shards = [shard for _, shard in ring]
+
+    def shard_for(self, owner_id: int) -> str:
+        """Name of the shard an owner's tasks belong on"""
+        index = bisect.bisect_left(self._points, self._hash(str(owner_id)))
+        return self._shards[index % len(self._shards)]
+
+    def session_for(self, owner_id: int) -> Session:
+        """New session on an owner's shard"""
+        return self.sessions[self.shard_for(owner_id)]()
+
+def _parse_shard_urls(value: str) -> List[Tuple[str, str]]:
+    shards = []
+    for entry in value.split(","):
+        if entry.strip():
+            name, _, url = entry.strip().partition("=")
+            shards.append((name.strip(), url.strip()))
+    return shards
+
+shard_router = ShardRouter()
+for _name, _url in _parse_shard_urls(DATABASE_SHARD_URLS):
+    shard_router.add_shard(_name, get_engine(_url))
+
+def shard_session(owner_id: int, default: Session):
+    """
+    Body of a session dependency for tasks: yields a session on the
+    owner's shard, or the default session when sharding is not configured
+    :param owner_id: ID of the user whose tasks are used
+    :param default: Session used without shards
+    """
+    if not shard_router.enabled:
+        yield default
+        return
+    db = shard_router.session_for(owner_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def create_shard_tables(shard_engine: Engine) -> None:
+    """
+    Create the tables on a task shard. Users only live on the primary
+    database, so foreign keys to users are left out; with them, every task
+    insert would fail on a database that enforces foreign keys.
+    :param shard_engine: Engine of the shard
+    """
+    shard_metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        shard_table = table.to_metadata(shard_metadata)
+        for constraint in list(shard_table.foreign_key_constraints):
+            if constraint.referred_table.name != "users":
+                continue
+            shard_table.constraints.discard(constraint)
+            for foreign_key in constraint.elements:
+                foreign_key.parent.foreign_keys.discard(foreign_key)
+                shard_table.foreign_keys.discard(foreign_key)
+    shard_metadata.create_all(bind=shard_engine)
+
+# Dependency to get a DB session for read-only endpoints
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session on the read replica, or the primary session when there is no
+    replica or the user wrote within the sticky window. The primary
+    session only connects if it is used.
+    """
+    if ReplicaSessionLocal is None or is_primary_sticky(request.scope):
+        yield db
+        return
+    replica = ReplicaSessionLocal()
+    try:
+        yield replica
+    finally:
+        replica.close()
@@ -0,0 +1,149 @@
+"""Group commit: concurrent writes committed together in one transaction"""
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import mark_primary_sticky
+from app.core.metrics import COUNT_BUCKETS, Counter, Histogram
+from app.core.request_context import current_request
+
+# Load environment variables
+load_dotenv()
+
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() == "true"
+# How long the first write of a batch waits for others to join it
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("GROUP_COMMIT_WINDOW_MS", "2"))
+# Most writes committed in one transaction
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "100"))
+
+group_commit_batch_size = Histogram(
+    "group_commit_batch_size", "Writes committed per group commit transaction", buckets=COUNT_BUCKETS
+)
+group_commit_retries_total = Counter(
+    "group_commit_retries_total", "Batches rerun without a write that failed"
+)
+
+# A write: runs in the batch's session and returns the value handed back to
+# the request. Raising fails only that write.
+WriteJob = Callable[[Session], Any]
+_Outcome = Tuple[asyncio.Future, Any, Optional[BaseException]]
+
+
+class GroupCommitWriter:
+    """
+    Collects writes submitted by concurrent requests for a few milliseconds
+    and commits them in a single transaction, so one commit (and fsync)
+    covers the whole batch.
+
+    Writes run one after another in the batch's session, each flushed
+    straight away. If one raises, the transaction is rolled back, that
+    write's request gets the exception and the rest of the batch is rerun
+    without it, so a failing write never fails or leaks into the others.
+    If the commit itself fails, every write in the batch gets the error.
+    """
+
+    def __init__(self, bind: Engine, window: float = GROUP_COMMIT_WINDOW_MS / 1000,
+                 max_batch: int = GROUP_COMMIT_MAX_BATCH):
+        """
+        Initialize the writer; must be called from the event loop it serves
+        :param bind: Engine the batches are committed on
+        :param window: Seconds a batch stays open after its first write
+        :param max_batch: Most writes per transaction
+        """
+        self.bind = bind
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[WriteJob, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self.loop = asyncio.get_running_loop()
+        # One batch commits at a time; the next one fills up meanwhile
+        self._commit_lock = asyncio.Lock()
+
+    async def submit(self, job: WriteJob) -> Any:
+        """
+        Add a write to the current batch and wait for the batch to commit
+        :param job: Write to run in the batch's session
+        :return: The job's return value, once committed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((job, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.create_task(self._flush_after_window())
+        result = await future
+        request = current_request.get()
+        if request is not None:
+            mark_primary_sticky(request.scope)
+        return result
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window)
+        async with self._commit_lock:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if self._pending:
+                asyncio.get_running_loop().create_task(self._flush_after_window())
+            else:
+                self._flush_scheduled = False
+            outcomes = await asyncio.get_running_loop().run_in_executor(None, self._commit, batch)
+        for future, result, error in outcomes:
+            if future.done():
+                continue  # The request was cancelled
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _commit(self, batch: List[Tuple[WriteJob, asyncio.Future]]) -> List[_Outcome]:
+        outcomes: List[_Outcome] = []
+        remaining = list(batch)
+        while remaining:
+            session = Session(bind=self.bind, autoflush=False)
+            results: Dict[int, Any] = {}
+            failed: Optional[Tuple[int, BaseException]] = None
+            try:
+                for index, (job, _) in enumerate(remaining):
+                    try:
+                        results[index] = job(session)
+                        session.flush()
+                    except Exception as e:
+                        failed = (index, e)
+                        break
+                if failed is None:
+                    session.commit()
+                    group_commit_batch_size.observe(len(remaining))
+                    outcomes.extend((future, results[index], None) for index, (_, future) in enumerate(remaining))
+                    return outcomes
+                session.rollback()
+            except Exception as e:
+                outcomes.extend((future, None, e) for _, future in remaining)
+                return outcomes
+            finally:
+                session.close()
+            index, error = failed
+            outcomes.append((remaining.pop(index)[1], None, error))
+            if remaining:
+                group_commit_retries_total.inc()
+        return outcomes
+
+
+# Writers by engine, created on first use
+_writers: Dict[Engine, GroupCommitWriter] = {}
+
+
+def group_commit_writer(db: Session) -> GroupCommitWriter:
+    """
+    Writer committing to the database a request's session writes to
+    (its shard, or the dedicated writer engine of the SQLite profile)
+    :param db: The request's session
+    """
+    bind = getattr(db, "writer", None) or db.get_bind()
+    writer = _writers.get(bind)
+    if writer is None or writer.loop is not asyncio.get_running_loop():
+        writer = _writers[bind] = GroupCommitWriter(bind)
+    return writer
@@ -1,11 +1,62 @@
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import random
 from pydantic import BaseModel
 import json
 import time
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
+
+# Fraction of successful, fast requests whose completion line is logged.
+# Errors (status >= 400) and slow requests are always logged.
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+LOG_SLOW_REQUEST_SECONDS = float(os.getenv("LOG_SLOW_REQUEST_SECONDS", "1.0"))
+# Most records waiting for the listener thread; further records are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter that outputs JSON strings after parsing the log record.
+    """
+    
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+    
+    def format(self, record: logging.LogRecord) -> str:
+        log_data: Dict[str, Any] = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        
+        if hasattr(record, "request_id"):
+            log_data["request_id"] = record.request_id
+            
+        if hasattr(record, "user_id"):
+            log_data["user_id"] = record.user_id
+            
+        # Include exception info if available
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        
+        return _dumps(log_data)
+
 class LogConfig(BaseModel):
     """Logging configuration"""
     
@@ -23,7 +74,7 @@ class LogConfig(BaseModel):
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
         "json": {
-            "()": "logging_config.JsonFormatter",
+            "()": JsonFormatter,
             "fmt": LOG_FORMAT,
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
@@ -43,39 +94,9 @@ class LogConfig(BaseModel):
         },
     }
     loggers = {
-        LOGGER_NAME: {"handlers": ["default", "file"], "level": LOG_LEVEL},
+        LOGGER_NAME: {"handlers": ["default", "file"], "level": LOG_LEVEL, "propagate": False},
     }
 
-class JsonFormatter(logging.Formatter):
-    """
-    Formatter that outputs JSON strings after parsing the log record.
-    """
-    
-    def __init__(self, fmt=None, datefmt=None):
-        super().__init__(fmt, datefmt)
-    
-    def format(self, record: logging.LogRecord) -> str:
-        log_data: Dict[str, Any] = {
-            "timestamp": self.formatTime(record, self.datefmt),
-            "level": record.levelname,
-            "message": record.getMessage(),
-            "module": record.module,
-            "function": record.funcName,
-            "line": record.lineno,
-        }
-        
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-            
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
-            
-        # Include exception info if available
-        if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
-        
-        return json.dumps(log_data)
-
 # Create logs directory if not exists
 os.makedirs("logs", exist_ok=True)
 
@@ -84,3 +105,48 @@ logging.config.dictConfig(LogConfig().dict())
 
 # Get the logger
 logger = logging.getLogger("smart_task_manager")
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves all formatting to the listener thread.
+    The stock prepare() renders the message and traceback on the calling
+    thread (the event loop) and clears exc_info, which JsonFormatter needs
+    for its exception field. Records are dropped, and counted, while the
+    queue is full, so a stalled listener cannot grow memory without limit.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _start_queue_listener(target: logging.Logger, maxsize: int = LOG_QUEUE_SIZE) -> logging.handlers.QueueListener:
+    """
+    Move the logger's handlers behind a bounded queue, so logging calls only
+    enqueue the record and a background thread does the formatting and I/O
+    """
+    handlers = list(target.handlers)
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize)
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(DeferredQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = _start_queue_listener(logger)
+
+def should_log_request(status_code: int, duration: float) -> bool:
+    """Decide whether a request's completion line is logged"""
+    if status_code >= 400 or duration >= LOG_SLOW_REQUEST_SECONDS:
+        return True
+    return LOG_REQUEST_SAMPLE_RATE >= 1.0 or random.random() < LOG_REQUEST_SAMPLE_RATE
@@ -0,0 +1,109 @@
+"""Event loop lag monitoring and blocking call detection"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.core.logging_config import logger
+from app.core.metrics import Counter, Histogram
+from app.core.profiling import fold_stack
+from app.core.request_context import active_requests
+
+# Load environment variables
+load_dotenv()
+
+# Seconds between loop lag samples
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# Lag above which the blocking stack is captured and reported
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.1"))
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds", "Delay between when the loop should have run a timer and when it did",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+event_loop_blocked_total = Counter(
+    "event_loop_blocked_total", "Times the event loop was blocked for longer than the threshold, by route",
+    ("route",)
+)
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop scheduling delay and catches the code blocking it.
+
+    A task on the loop wakes every interval and records how late it woke up
+    (the lag). A watchdog thread checks that those wake-ups keep happening;
+    when the loop has not run the task for longer than the threshold, it
+    captures the loop thread's stack while it is still blocked and
+    attributes it to the request whose task is running.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_LAG_THRESHOLD,
+                 history: int = 20):
+        """
+        Initialize the monitor
+        :param interval: Seconds between lag samples
+        :param threshold: Lag in seconds above which a stall is reported
+        :param history: Number of recent stalls kept for inspection
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Dict] = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+
+    async def run(self) -> None:
+        """Sample loop lag until cancelled"""
+        loop = asyncio.get_running_loop()
+        stopped = threading.Event()
+        watchdog = threading.Thread(
+            target=self._watch, args=(loop, threading.get_ident(), stopped), name="loop-monitor", daemon=True
+        )
+        self._heartbeat = time.monotonic()
+        watchdog.start()
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                self._heartbeat = time.monotonic()
+                event_loop_lag_seconds.observe(max(loop.time() - expected, 0.0))
+        finally:
+            stopped.set()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, thread_id: int, stopped: threading.Event) -> None:
+        while not stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            lag = time.monotonic() - heartbeat - self.interval
+            if lag > self.threshold and heartbeat != self._reported_heartbeat:
+                # Report each stall once, with the stack as it is now
+                self._reported_heartbeat = heartbeat
+                self._report(loop, thread_id, lag)
+
+    def _report(self, loop: asyncio.AbstractEventLoop, thread_id: int, lag: float) -> None:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            return
+        request = active_requests.get(asyncio.current_task(loop))
+        route = (request.route or request.path) if request is not None else "unknown"
+        event_loop_blocked_total.labels(route).inc()
+        stack = "".join(traceback.format_stack(frame))
+        self.stalls.append({
+            "detected_at": datetime.utcnow(),
+            "lag": lag,
+            "route": route,
+            "request_id": request.request_id if request is not None else None,
+            "stack": fold_stack(frame),
+        })
+        logger.warning(f"Event loop blocked for over {lag:.3f}s while serving {route}:\n{stack}",
+                       extra={"request_id": request.request_id if request is not None else None})
+
+
+loop_monitor = LoopLagMonitor()
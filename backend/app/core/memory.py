@@ -0,0 +1,177 @@
+"""Memory diagnostics: tracemalloc snapshots and periodic memory gauges"""
+
+import asyncio
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.core.logging_config import logger
+from app.core.metrics import Gauge
+
+# Load environment variables
+load_dotenv()
+
+# Seconds between samples of the process memory gauges
+MEMORY_SAMPLE_SECONDS = float(os.getenv("MEMORY_SAMPLE_SECONDS", "15"))
+
+process_resident_memory_bytes = Gauge("process_resident_memory_bytes", "Resident set size of the process")
+python_gc_objects = Gauge("python_gc_objects", "Objects tracked by the garbage collector")
+tracemalloc_traced_bytes = Gauge(
+    "tracemalloc_traced_bytes", "Memory traced by tracemalloc (0 when not tracing)",
+    callback=lambda: tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+)
+
+
+def _rate_limiter_clients() -> Dict[tuple, float]:
+    from app.core.rate_limit import rate_limit_policies
+    return {
+        (limiter.name,): limiter.backend.client_count
+        for limiter in rate_limit_policies.limiters
+        if hasattr(limiter.backend, "client_count")
+    }
+
+
+rate_limiter_clients = Gauge(
+    "rate_limiter_clients", "Clients tracked in process by each rate limiter", ("limiter",),
+    callback=_rate_limiter_clients
+)
+
+
+def read_rss() -> Optional[int]:
+    """Current resident set size in bytes, or None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def sample_memory() -> None:
+    """Update the process memory gauges"""
+    rss = read_rss()
+    if rss is not None:
+        process_resident_memory_bytes.set(rss)
+    python_gc_objects.set(len(gc.get_objects()))
+
+
+async def run_memory_sampler(interval: float = MEMORY_SAMPLE_SECONDS) -> None:
+    """Periodically update the memory gauges (counting objects is too slow to do on every scrape)"""
+    while True:
+        try:
+            sample_memory()
+        except Exception as e:
+            logger.warning(f"Memory sampling failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+def _module_name(filename: str) -> str:
+    """Map a source file to its module name using the longest matching sys.path entry"""
+    best = ""
+    for entry in sys.path:
+        entry = os.path.abspath(entry or ".")
+        if filename.startswith(entry + os.sep) and len(entry) > len(best):
+            best = entry
+    relative = filename[len(best) + 1:] if best else filename
+    if relative.endswith(".py"):
+        relative = relative[:-3]
+    if relative.endswith(os.sep + "__init__"):
+        relative = relative[:-len("__init__") - 1]
+    return relative.replace(os.sep, ".")
+
+
+class MemoryTracer:
+    """
+    Starts and stops tracemalloc and compares snapshots.
+    Each report diffs a new snapshot against the previous one (or the one
+    taken at start), so repeated reports show what grew in between.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        """
+        Start tracing allocations and take the baseline snapshot
+        :param frames: Stack frames kept per allocation
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._snapshot = self._take_snapshot()
+
+    def stop(self) -> None:
+        """Stop tracing and drop the stored snapshot"""
+        with self._lock:
+            tracemalloc.stop()
+            self._snapshot = None
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def report(self, top: int = 20) -> Dict:
+        """
+        Diff a new snapshot against the previous one, grouped by module
+        :param top: Number of modules and allocation sites returned
+        :return: Traced totals, top modules and top allocation lines by growth
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._snapshot is None:
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = self._take_snapshot()
+            lines = snapshot.compare_to(self._snapshot, "lineno")
+            self._snapshot = snapshot
+
+        modules: Dict[str, Dict[str, int]] = defaultdict(lambda: {"size": 0, "size_diff": 0, "count": 0, "count_diff": 0})
+        for stat in lines:
+            module = modules[_module_name(stat.traceback[0].filename)]
+            module["size"] += stat.size
+            module["size_diff"] += stat.size_diff
+            module["count"] += stat.count
+            module["count_diff"] += stat.count_diff
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "modules": sorted(
+                ({"module": name, **totals} for name, totals in modules.items()),
+                key=lambda entry: entry["size_diff"], reverse=True
+            )[:top],
+            "sites": [
+                {
+                    "module": _module_name(stat.traceback[0].filename),
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in lines[:top]
+            ],
+        }
+
+
+memory_tracer = MemoryTracer()
@@ -0,0 +1,289 @@
+"""
+Application metrics in the Prometheus text exposition format.
+
+Metrics are plain Python objects. Every update is a single increment of a
+preallocated slot, made under one module-wide lock because some metrics
+(pool waits, group commits, archival) are updated from executor threads.
+Histogram buckets are allocated once per label set, so observing a value
+is a bisect and an increment.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.core.cache import cache_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Buckets for per-request statement counts
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+# Guards every value update; uncontended, it costs well under a microsecond
+_update_lock = threading.Lock()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with _update_lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with _update_lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf, stored non-cumulatively
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with _update_lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric:
+    """Base class for metrics, optionally split by labels"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None):
+        """
+        Initialize the metric
+        :param name: Metric name
+        :param documentation: Help text
+        :param labelnames: Label names; values are passed to labels()
+        :param registry: Registry to add the metric to, defaults to REGISTRY
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values: str):
+        """Return the child for a set of label values, creating it on first use"""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        for values, child in list(self._children.items()):
+            yield self.name, values, child.value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, values, value in self.samples():
+            lines.append(f"{name}{_format_labels(self.labelnames, values)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+    With a callback, the value is read when metrics are rendered; the
+    callback returns a number, or a dict of label values to numbers.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None,
+                 callback: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames, registry)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    @property
+    def value(self) -> float:
+        return self._children[()].value
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        if self.callback is None:
+            yield from super().samples()
+            return
+        result = self.callback()
+        if isinstance(result, dict):
+            for values, value in result.items():
+                yield self.name, values, value
+        else:
+            yield self.name, (), result
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        label_names = self.labelnames + ("le",)
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(child.counts)):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(label_names, values + (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+# Database
+db_statements_per_request = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request", ("route",), buckets=COUNT_BUCKETS
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per HTTP request", ("route",)
+)
+
+# AI prioritization service
+ai_scoring_duration_seconds = Histogram(
+    "ai_scoring_duration_seconds", "Latency of calls to the AI prioritization service"
+)
+ai_scoring_failures_total = Counter(
+    "ai_scoring_failures_total", "Failed calls to the AI prioritization service"
+)
+
+# Rate limiting
+rate_limit_rejections_total = Counter(
+    "rate_limit_rejections_total", "Requests rejected by a rate limiter", ("limiter",)
+)
+
+
+def _cache_stat(field: str) -> Callable[[], Dict[LabelValues, float]]:
+    return lambda: {(name,): stats[field] for name, stats in cache_stats().items()}
+
+
+# In-process caches (see app.core.cache)
+Gauge("cache_hits", "Cache hits since the cache was created or cleared", ("cache",), callback=_cache_stat("hits"))
+Gauge("cache_misses", "Cache misses since the cache was created or cleared", ("cache",), callback=_cache_stat("misses"))
+Gauge("cache_hit_ratio", "Fraction of cache lookups that were hits", ("cache",), callback=_cache_stat("hit_rate"))
+Gauge("cache_size", "Entries currently held in the cache", ("cache",), callback=_cache_stat("size"))
+
+
+# Methods recorded as themselves; any other method is recorded as "other",
+# so clients cannot create label series at will
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"))
+
+
+def record_request(method: str, route: str, status_code: int, duration: float,
+                   db_statements: int, db_time: float) -> None:
+    """
+    Record a finished HTTP request
+    :param method: HTTP method, or "other" outside HTTP_METHODS
+    :param route: Route template, or "unmatched" for requests no route handled
+    :param status_code: Response status code
+    :param duration: Time taken to serve the request, in seconds
+    :param db_statements: SQL statements executed while serving it
+    :param db_time: Time spent executing them, in seconds
+    """
+    if method not in HTTP_METHODS:
+        method = "other"
+    http_requests_total.labels(method, route, str(status_code)).inc()
+    http_request_duration_seconds.labels(method, route).observe(duration)
+    db_statements_per_request.labels(route).observe(db_statements)
+    db_time_per_request_seconds.labels(route).observe(db_time)
+
+
+def render_metrics() -> str:
+    """Render all registered metrics"""
+    return REGISTRY.render()
@@ -0,0 +1,107 @@
+"""Pure ASGI middleware handling cross-cutting request concerns"""
+
+import asyncio
+import json
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging_config import logger, should_log_request
+from app.core.metrics import http_requests_in_flight, rate_limit_rejections_total, record_request
+from app.core.profiling import SamplingProfiler, profile_name, profile_requested, profiling_allowed, save_profile
+from app.core.rate_limit import rate_limit_policies
+from app.core.request_context import RequestContext, active_requests, current_request
+from app.core.versioning import get_api_version
+
+
+class RequestMiddleware:
+    """
+    Single ASGI middleware that, for every HTTP request:
+    - assigns a request ID and returns it in X-Request-ID
+    - applies the rate limit policies
+    - adds the X-API-Version header to /api/ responses
+    - logs the request with its status and duration (sampled, see
+      should_log_request)
+    - records request metrics, including the SQL statements run while
+      serving it (see app.core.metrics)
+    - profiles the request when an admin asks for it with the X-Profile
+      header or ?profile=1 (see app.core.profiling)
+
+    Unlike @app.middleware("http") layers it does not wrap the request in a
+    new task or re-stream the response body; it only hooks the response
+    start message to add headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid.uuid4())
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        api_version = get_api_version(path)
+        status_code = 500
+
+        profiler = None
+        if profile_requested(scope) and profiling_allowed(scope):
+            profiler = SamplingProfiler()
+            profile_id = profile_name(request_id, method, path)
+
+        logger.debug(f"Request started: {method} {path}", extra={"request_id": request_id})
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                if api_version is not None:
+                    headers.append("X-API-Version", api_version)
+                if profiler is not None:
+                    headers.append("X-Profile-ID", profile_id)
+            await send(message)
+
+        context = RequestContext(request_id, scope)
+        context_token = current_request.set(context)
+        task = asyncio.current_task()
+        active_requests[task] = context
+        http_requests_in_flight.inc()
+        if profiler is not None:
+            profiler.start()
+        try:
+            # Apply the policies for this request's route group
+            policy = await rate_limit_policies.check(scope)
+            if policy is not None:
+                rate_limit_rejections_total.labels(policy.limiter.name).inc()
+                client = scope.get("client")
+                logger.warning(f"Rate limit '{policy.limiter.name}' exceeded for {client[0] if client else 'unknown'}",
+                               extra={"request_id": request_id})
+                response = Response(
+                    content=json.dumps({"detail": policy.detail}),
+                    status_code=429,
+                    media_type="application/json"
+                )
+                await response(scope, receive, send_with_headers)
+            else:
+                await self.app(scope, receive, send_with_headers)
+        finally:
+            if profiler is not None:
+                save_profile(profile_id, profiler.stop())
+            http_requests_in_flight.dec()
+            current_request.reset(context_token)
+            active_requests.pop(task, None)
+
+            process_time = time.perf_counter() - start_time
+            record_request(method, context.route or "unmatched", status_code, process_time,
+                           context.db_statements, context.db_time)
+            if should_log_request(status_code, process_time):
+                logger.info(f"Request completed: {method} {path} - Status: {status_code} - Duration: {process_time:.3f}s",
+                            extra={"request_id": request_id})
@@ -0,0 +1,150 @@
+"""On-demand profiling of single requests"""
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from starlette.types import Scope
+
+from app.core.auth import ADMIN_USERNAMES, get_scope_token_claims
+from app.core.logging_config import logger
+
+# Load environment variables
+load_dotenv()
+
+# Where captured profiles are written
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Seconds between stack samples (the GIL switch interval, 5ms, bounds how
+# often a thread running Python code can actually be sampled)
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+# Oldest profiles are deleted beyond this many
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+PROFILE_SUFFIX = ".folded"
+_PROFILE_NAME = re.compile(r"^(\d{8}T\d{6})_([A-Z]+)_([\w.\-]*)_([0-9a-f]{8})\.folded$")
+_UNSAFE_PATH_CHARS = re.compile(r"[^\w.\-]+")
+
+
+def format_frame(frame) -> str:
+    """Name a frame as module:function:line"""
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def fold_stack(frame) -> str:
+    """Render a frame and its callers root-first, separated by semicolons"""
+    names = []
+    while frame is not None:
+        names.append(format_frame(frame))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread.
+    Stacks are counted in the collapsed ("folded") format read by
+    flamegraph.pl, speedscope and most other flame graph tools.
+
+    Profiling a request samples the event loop thread, so time the request
+    spends awaiting I/O shows up under the loop's selector, and work done
+    for other requests served concurrently is included too.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_SAMPLE_INTERVAL):
+        """
+        Initialize the profiler
+        :param thread_id: Thread to sample, defaults to the calling thread
+        :param interval: Seconds between samples
+        """
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the counted stacks"""
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+
+def profile_requested(scope: Scope) -> bool:
+    """Check for the X-Profile header or the profile query flag"""
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.lower() in (b"1", b"true", b"yes")
+    query = scope.get("query_string", b"")
+    return b"profile=" in query and re.search(rb"(?:^|&)profile=(?:1|true|yes)(?:&|$)", query) is not None
+
+
+def profiling_allowed(scope: Scope) -> bool:
+    """Only admins may profile requests"""
+    claims = get_scope_token_claims(scope)
+    return claims is not None and claims["sub"] in ADMIN_USERNAMES
+
+
+def profile_name(request_id: str, method: str, path: str) -> str:
+    """File name for a request's profile"""
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    slug = _UNSAFE_PATH_CHARS.sub("-", path.strip("/").replace("/", "."))
+    return f"{timestamp}_{method}_{slug}_{request_id[:8]}{PROFILE_SUFFIX}"
+
+
+def save_profile(name: str, stacks: Counter) -> None:
+    """Write a profile in the folded stack format and drop the oldest profiles"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    names = sorted(entry for entry in os.listdir(PROFILE_DIR) if _PROFILE_NAME.match(entry))
+    for old in names[:max(len(names) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old))
+        except OSError as e:
+            logger.warning(f"Could not remove old profile {old}: {str(e)}")
+
+
+def list_profiles() -> List[Dict]:
+    """Captured profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        match = _PROFILE_NAME.match(entry)
+        if match is None:
+            continue
+        timestamp, method, slug, request_id = match.groups()
+        profiles.append({
+            "name": entry,
+            "method": method,
+            "path": "/" + slug.replace(".", "/"),
+            "request_id": request_id,
+            "captured_at": datetime.strptime(timestamp, "%Y%m%dT%H%M%S"),
+            "size": os.path.getsize(os.path.join(PROFILE_DIR, entry)),
+        })
+    return profiles
+
+
+def get_profile_path(name: str) -> Optional[str]:
+    """Path of a captured profile, or None if there is no such profile"""
+    if _PROFILE_NAME.match(name) is None:
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -1,76 +1,188 @@
 """Rate limiting module for API protection"""
 
-import time
-from typing import Dict, Tuple, Optional
+import os
+import re
+from typing import Dict, List, Optional, Sequence
 from fastapi import Request, HTTPException, status
-import asyncio
+from dotenv import load_dotenv
+from starlette.types import Scope
 from app.core.logging_config import logger
+from app.core.rate_limit_backends import InMemoryBackend, create_backend
+
+# Load environment variables
+load_dotenv()
+
+# Where limiter state lives: "memory" (per worker), "shm" (shared by the
+# workers on a host) or "redis" (shared by every host)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# Budget per authenticated user across all of their clients
+USER_RATE_LIMIT = int(os.getenv("USER_RATE_LIMIT", "300"))
 
 class RateLimiter:
     """
-    Simple in-memory rate limiter.
-    In production, use a more robust solution like Redis.
+    GCRA (token bucket) rate limiter.
+
+    Each client is tracked by a single theoretical arrival time (TAT), so a
+    check is O(1). Where the TATs are stored is up to the backend; see
+    app.core.rate_limit_backends.
     """
-    
-    def __init__(self, rate_limit: int = 100, time_window: int = 60):
+
+    def __init__(self, rate_limit: int = 100, time_window: int = 60,
+                 backend=None, name: str = "default"):
         """
         Initialize rate limiter
         :param rate_limit: Maximum requests per time window
         :param time_window: Time window in seconds
+        :param backend: Storage backend, defaults to an in-process one
+        :param name: Namespace separating this limiter's keys in shared backends
         """
         self.rate_limit = rate_limit
         self.time_window = time_window
-        self.client_requests: Dict[str, Tuple[int, float]] = {}
-        self.lock = asyncio.Lock()
-    
-    async def check_rate_limit(self, client_id: str) -> bool:
+        self.backend = backend if backend is not None else InMemoryBackend(time_window)
+        self.name = name
+
+    def allow(self, client_id: str, now: Optional[float] = None) -> bool:
+        """
+        Synchronously check a client, for backends that support it
+        :param client_id: Unique client identifier (IP, API key, etc.)
+        :param now: Current time, for testing
+        :return: True if limit not exceeded, False otherwise
+        """
+        return self.backend.allow(
+            f"{self.name}:{client_id}", self.time_window / self.rate_limit, self.time_window, now
+        )
+
+    async def check_rate_limit(self, client_id: str, cost: int = 1) -> bool:
         """
         Check if client has exceeded rate limit
         :param client_id: Unique client identifier (IP, API key, etc.)
+        :param cost: Number of requests this request counts as
         :return: True if limit not exceeded, False otherwise
         """
-        async with self.lock:
-            current_time = time.time()
-            
-            # Clean up old entries every 100 requests
-            if len(self.client_requests) > 100:
-                await self._cleanup(current_time)
-            
-            # Get client's request history
-            requests, window_start = self.client_requests.get(client_id, (0, current_time))
-            
-            # Reset window if time window has passed
-            if current_time - window_start > self.time_window:
-                requests = 0
-                window_start = current_time
-            
-            # Check if rate limit is exceeded
-            if requests >= self.rate_limit:
-                return False
-            
-            # Update client's request count
-            self.client_requests[client_id] = (requests + 1, window_start)
-            return True
-    
-    async def _cleanup(self, current_time: float) -> None:
-        """Remove entries older than time window"""
-        to_delete = []
-        
-        for client_id, (_, window_start) in self.client_requests.items():
-            if current_time - window_start > self.time_window:
-                to_delete.append(client_id)
-        
-        for client_id in to_delete:
-            del self.client_requests[client_id]
+        return await self.backend.consume(
+            f"{self.name}:{client_id}", self.time_window / self.rate_limit * cost, self.time_window
+        )
+
+class RateLimitPolicy:
+    """A limiter applied to a set of route groups, keyed per IP or per user"""
+
+    def __init__(self, limiter: RateLimiter, route_groups: Sequence[str] = ("*",),
+                 scope: str = "ip", cost: int = 1, detail: str = "Rate limit exceeded. Please try again later."):
+        """
+        Initialize the policy
+        :param limiter: Limiter holding the budget
+        :param route_groups: Route groups the policy applies to ("*" for all)
+        :param scope: "ip" to key on the client address, "user" to key on the
+                      authenticated user (falling back to the address)
+        :param cost: Number of requests a matching request counts as
+        :param detail: Error detail returned when the limit is exceeded
+        """
+        self.limiter = limiter
+        self.route_groups = tuple(route_groups)
+        self.scope = scope
+        self.cost = cost
+        self.detail = detail
+
+class RateLimitPolicies:
+    """
+    Declarative rate limit policies.
+    Route groups are compiled into one regular expression over
+    "METHOD /path", so each request is matched once and then checked
+    against the policies precomputed for its group.
+    """
+
+    def __init__(self, route_groups: Dict[str, List[str]], policies: List[RateLimitPolicy]):
+        """
+        Compile the policies
+        :param route_groups: Group name -> patterns matched against "METHOD /path";
+                             the first group with a matching pattern wins
+        :param policies: Policies, checked in order
+        """
+        self.group_names = list(route_groups)
+        self.policies = policies
+        self._pattern = re.compile("|".join(
+            f"(?P<g{index}>{'|'.join(f'(?:{pattern})' for pattern in patterns)})"
+            for index, patterns in enumerate(route_groups.values())
+        ))
+        self._group_policies = {
+            name: [policy for policy in policies if "*" in policy.route_groups or name in policy.route_groups]
+            for name in self.group_names + [None]
+        }
+
+    @property
+    def limiters(self) -> List[RateLimiter]:
+        return list({id(policy.limiter): policy.limiter for policy in self.policies}.values())
+
+    def match(self, method: str, path: str) -> Optional[str]:
+        """Return the route group of a request, or None if no group matches"""
+        match = self._pattern.match(f"{method} {path}")
+        if match is None:
+            return None
+        return self.group_names[int(match.lastgroup[1:])]
+
+    async def check(self, scope: Scope) -> Optional[RateLimitPolicy]:
+        """
+        Apply every policy for the request's route group
+        :param scope: ASGI scope of the request
+        :return: The policy whose limit was exceeded, or None if allowed
+        """
+        group = self.match(scope["method"], scope["path"])
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
+        user_key = None
+        for policy in self._group_policies[group]:
+            if policy.scope == "user":
+                if user_key is None:
+                    user_key = _user_key(scope) or f"ip:{client_host}"
+                key = user_key
+            else:
+                key = client_host
+            if not await policy.limiter.check_rate_limit(key, policy.cost):
+                return policy
+        return None
+
+def _user_key(scope: Scope) -> Optional[str]:
+    """Identify the authenticated user from the bearer token, if valid"""
+    from app.core.auth import get_scope_token_claims
+    claims = get_scope_token_claims(scope)
+    return f"user:{claims['sub']}" if claims else None
 
 # Initialize rate limiter with default settings
-general_rate_limiter = RateLimiter()
+general_rate_limiter = RateLimiter(
+    backend=create_backend(RATE_LIMIT_BACKEND, time_window=60), name="general"
+)
 
 # More strict rate limiter for authentication endpoints
-auth_rate_limiter = RateLimiter(rate_limit=5, time_window=60)
+auth_rate_limiter = RateLimiter(
+    rate_limit=5, time_window=60,
+    backend=create_backend(RATE_LIMIT_BACKEND, time_window=60), name="auth"
+)
+
+# Per-user limiter shared by all of a user's clients
+user_rate_limiter = RateLimiter(
+    rate_limit=USER_RATE_LIMIT, time_window=60,
+    backend=create_backend(RATE_LIMIT_BACKEND, time_window=60), name="user"
+)
+
+# Route groups, matched against "METHOD /path" (first match wins)
+_API = r"/api(?:/v\d+)?"
+RATE_LIMIT_ROUTE_GROUPS = {
+    "auth": [r"[A-Z]+ /api/auth(?:/|$)", rf"POST {_API}/token(?:/refresh)?$"],
+    "task_writes": [rf"(?:POST|PUT|DELETE) {_API}/tasks(?:/|$)"],
+    "api": [r"[A-Z]+ /api/"],
+}
+
+# Policies applied to each route group; costs weight expensive requests
+rate_limit_policies = RateLimitPolicies(RATE_LIMIT_ROUTE_GROUPS, [
+    RateLimitPolicy(auth_rate_limiter, ["auth"], detail="Authentication rate limit exceeded"),
+    RateLimitPolicy(user_rate_limiter, ["task_writes"], scope="user", cost=3),
+    RateLimitPolicy(user_rate_limiter, ["api"], scope="user"),
+    RateLimitPolicy(general_rate_limiter, ["task_writes", "api", None]),
+])
 
 async def rate_limit_dependency(
-    request: Request, 
+    request: Request,
     limiter: Optional[RateLimiter] = None,
 ):
     """
@@ -80,10 +192,10 @@ async def rate_limit_dependency(
     """
     if limiter is None:
         limiter = general_rate_limiter
-    
+
     # Get client identifier (IP address in this case)
     client_id = request.client.host
-    
+
     # Check rate limit
     if not await limiter.check_rate_limit(client_id):
         logger.warning(f"Rate limit exceeded for {client_id}")
@@ -0,0 +1,399 @@
+"""
+Storage backends for the GCRA rate limiter.
+
+Every backend stores one theoretical arrival time (TAT) per key and applies
+the same rule: a request is allowed while the client's TAT, pushed forward
+by one emission interval, stays within the time window.
+
+- InMemoryBackend: per-process dictionaries (limits are per worker)
+- SharedMemoryBackend: an mmap'd table shared by all workers on a host
+- RedisBackend: a Redis server (or anything speaking its protocol), shared
+  by all hosts
+"""
+
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.logging_config import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+# Slack allowed when checking a TAT against the window. Adding a float
+# emission interval over and over drifts by a few ULPs, enough to refuse
+# the last request of a full window; the slack is capped at half an
+# emission interval, so it never admits an extra request.
+TAT_TOLERANCE = 1e-3
+
+
+def _exceeds_window(new_tat: float, now: float, emission_interval: float, time_window: float) -> bool:
+    return new_tat - now > time_window + min(TAT_TOLERANCE, emission_interval / 2)
+
+
+class InMemoryBackend:
+    """
+    Per-process backend. Client state is split across shards, and idle
+    clients are expired incrementally by a timing wheel instead of a scan.
+    Checks never await, so they run atomically on the event loop.
+    """
+
+    def __init__(self, time_window: float = 60, shards: int = 16, wheel_slots: int = 64):
+        """
+        Initialize the backend
+        :param time_window: Longest time window the backend is used with
+        :param shards: Number of dictionaries client state is spread over
+        :param wheel_slots: Number of timing wheel slots used for expiry
+        """
+        self._shards: List[Dict[str, Tuple[float, int]]] = [{} for _ in range(shards)]
+        self._wheel: List[List[str]] = [[] for _ in range(wheel_slots)]
+        self._slot_width = time_window / wheel_slots
+        self._tick = int(time.monotonic() / self._slot_width)
+
+    @property
+    def client_count(self) -> int:
+        """Number of clients currently tracked"""
+        return sum(len(shard) for shard in self._shards)
+
+    def allow(self, key: str, emission_interval: float, time_window: float,
+              now: Optional[float] = None) -> bool:
+        """
+        Check and record a request against the key's budget
+        :param key: Client key
+        :param emission_interval: Seconds of budget one request uses
+        :param time_window: Time window in seconds
+        :param now: Current monotonic time, for testing
+        :return: True if limit not exceeded, False otherwise
+        """
+        if now is None:
+            now = time.monotonic()
+        tick = int(now / self._slot_width)
+        if tick != self._tick:
+            self._advance(tick, now)
+
+        shard = self._shards[hash(key) % len(self._shards)]
+        entry = shard.get(key)
+        tat = now if entry is None or entry[0] < now else entry[0]
+        new_tat = tat + emission_interval
+        if _exceeds_window(new_tat, now, emission_interval, time_window):
+            return False
+
+        # Schedule expiry in the wheel slot where the new TAT falls
+        expire_tick = int(new_tat / self._slot_width) + 1
+        if entry is None or entry[1] != expire_tick:
+            self._wheel[expire_tick % len(self._wheel)].append(key)
+        shard[key] = (new_tat, expire_tick)
+        return True
+
+    async def consume(self, key: str, emission_interval: float, time_window: float) -> bool:
+        return self.allow(key, emission_interval, time_window)
+
+    def _advance(self, tick: int, now: float) -> None:
+        """Expire clients whose TAT has passed in the slots elapsed since the last check"""
+        slots = len(self._wheel)
+        start = max(self._tick + 1, tick - slots + 1)
+        for elapsed_tick in range(start, tick + 1):
+            index = elapsed_tick % slots
+            pending = self._wheel[index]
+            if not pending:
+                continue
+            keep = []
+            for key in pending:
+                shard = self._shards[hash(key) % len(self._shards)]
+                entry = shard.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del shard[key]
+                elif entry[1] % slots == index and entry[1] > elapsed_tick:
+                    # Scheduled for a later lap of the wheel
+                    keep.append(key)
+            self._wheel[index] = keep
+        self._tick = tick
+
+
+class SharedMemoryBackend:
+    """
+    Backend storing TATs in a memory-mapped file, so every worker process
+    on the host shares one budget per client.
+
+    The file is an open-addressing hash table of (key hash, TAT) records.
+    A key may live in any of PROBE consecutive records; those records are
+    locked with a POSIX record lock while the key is checked. Expired
+    records are reused, and when every candidate is live the one expiring
+    soonest is overwritten.
+    """
+
+    RECORD = struct.Struct("<Qd")
+    PROBE = 8
+
+    def __init__(self, path: str, slots: int = 1 << 16):
+        """
+        Open (or create) the shared table
+        :param path: File backing the table; use tmpfs (/dev/shm) on Linux
+        :param slots: Number of records in the table
+        """
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBackend requires POSIX file locking")
+        self.path = path
+        self.slots = slots
+        size = (slots + self.PROBE) * self.RECORD.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _locate(self, key: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        key_hash = int.from_bytes(digest, "little") or 1
+        return key_hash, key_hash % self.slots
+
+    def allow(self, key: str, emission_interval: float, time_window: float,
+              now: Optional[float] = None) -> bool:
+        """
+        Check and record a request against the key's budget
+        :param key: Client key
+        :param emission_interval: Seconds of budget one request uses
+        :param time_window: Time window in seconds
+        :param now: Current wall-clock time, for testing
+        :return: True if limit not exceeded, False otherwise
+        """
+        if now is None:
+            now = time.time()
+        key_hash, start = self._locate(key)
+        record_size = self.RECORD.size
+        offset = start * record_size
+        length = self.PROBE * record_size
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, length, offset)
+        try:
+            target = None
+            target_tat = None
+            tat = now
+            for position in range(offset, offset + length, record_size):
+                stored_hash, stored_tat = self.RECORD.unpack_from(self._map, position)
+                if stored_hash == key_hash:
+                    target = position
+                    tat = max(stored_tat, now)
+                    break
+                # Prefer an empty or expired record, else the soonest to expire
+                if target_tat is None or stored_tat < target_tat:
+                    target, target_tat = position, stored_tat
+
+            new_tat = tat + emission_interval
+            if _exceeds_window(new_tat, now, emission_interval, time_window):
+                return False
+            self.RECORD.pack_into(self._map, target, key_hash, new_tat)
+            return True
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, length, offset)
+
+    async def consume(self, key: str, emission_interval: float, time_window: float) -> bool:
+        return self.allow(key, emission_interval, time_window)
+
+
+# GCRA as a Redis script so the read-modify-write is atomic on the server
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local tolerance = math.min(tonumber(ARGV[4]), interval / 2)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - now > window + tolerance then return 0 end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return 1
+"""
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server"""
+
+
+class RedisBackend:
+    """
+    Backend storing TATs in Redis, shared by every worker on every host.
+
+    Speaks the Redis protocol (RESP) directly over one pipelined asyncio
+    connection: requests are written in order and replies are matched to
+    waiting callers first-in, first-out. TATs use the workers' wall clocks,
+    so hosts are expected to keep their clocks in sync. If the server is
+    unreachable, or does not answer within the timeout, the limiter fails
+    open and retries the connection later.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "ratelimit:",
+                 retry_interval: float = 1.0, timeout: float = 0.5):
+        """
+        Initialize the backend
+        :param url: redis://[:password@]host[:port][/db]
+        :param prefix: Prefix for every key written
+        :param retry_interval: Minimum seconds between reconnect attempts
+        :param timeout: Seconds to wait for the connection or a reply
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._read_task: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._next_attempt = 0.0
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            return RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply from Redis server: {line!r}")
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                reply = await self._read_reply()
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            self._disconnect(e)
+
+    def _disconnect(self, error: Exception) -> None:
+        # Stop the reader so it cannot tear down a later connection
+        if self._read_task is not None and self._read_task is not asyncio.current_task():
+            self._read_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self._read_task = None
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(str(error)))
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        self._read_task = asyncio.ensure_future(self._read_loop())
+        if self.password:
+            await self.execute("AUTH", self.password)
+        if self.db:
+            await self.execute("SELECT", self.db)
+
+    async def _ensure_connected(self) -> None:
+        if self._writer is not None:
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        try:
+            await asyncio.shield(self._connecting)
+        finally:
+            self._connecting = None
+
+    async def execute(self, *args):
+        """Send one command and wait for its reply, for at most the timeout"""
+        if self._writer is None:
+            raise ConnectionError("Not connected to Redis server")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._writer.write(self._encode(*args))
+        reply = await asyncio.wait_for(future, self.timeout)
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    async def consume(self, key: str, emission_interval: float, time_window: float) -> bool:
+        """
+        Check and record a request against the key's budget
+        :param key: Client key
+        :param emission_interval: Seconds of budget one request uses
+        :param time_window: Time window in seconds
+        :return: True if limit not exceeded (or Redis is unavailable)
+        """
+        if self._writer is None and time.monotonic() < self._next_attempt:
+            return True
+        try:
+            await self._ensure_connected()
+            result = await self.execute(
+                "EVAL", GCRA_SCRIPT, 1, self.prefix + key,
+                repr(time.time()), repr(emission_interval), repr(time_window), repr(TAT_TOLERANCE),
+            )
+            return result == 1
+        except asyncio.TimeoutError:
+            logger.warning("Redis rate limit backend timed out, allowing request")
+            self._disconnect(ConnectionError("Timed out waiting for Redis server"))
+            self._next_attempt = time.monotonic() + self.retry_interval
+            return True
+        except (OSError, ConnectionError, RedisError) as e:
+            logger.warning(f"Redis rate limit backend unavailable, allowing request: {str(e)}")
+            self._disconnect(e)
+            self._next_attempt = time.monotonic() + self.retry_interval
+            return True
+
+
+def _default_shm_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "smarttask-ratelimit")
+
+
+def create_backend(kind: str, time_window: float = 60):
+    """
+    Create a rate limit backend by name
+    :param kind: "memory", "shm" or "redis"
+    :param time_window: Time window of the limiter using the backend
+    """
+    if kind == "memory":
+        return InMemoryBackend(time_window)
+    if kind == "shm":
+        return SharedMemoryBackend(
+            os.getenv("RATE_LIMIT_SHM_PATH", _default_shm_path()),
+            int(os.getenv("RATE_LIMIT_SHM_SLOTS", str(1 << 16))),
+        )
+    if kind == "redis":
+        return RedisBackend(
+            os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"),
+            timeout=float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.5")),
+        )
+    raise ValueError(f"Unknown rate limit backend: {kind}")
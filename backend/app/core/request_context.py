@@ -0,0 +1,46 @@
+"""Per-request context shared by the request middleware and instrumentation hooks"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from starlette.types import Scope
+
+
+class RequestContext:
+    """State of the request being served, reachable from code that has no Request object"""
+
+    __slots__ = ("request_id", "scope", "db_statements", "db_time")
+
+    def __init__(self, request_id: str, scope: Scope):
+        """
+        Initialize the context
+        :param request_id: ID returned to the client in X-Request-ID
+        :param scope: ASGI scope of the request
+        """
+        self.request_id = request_id
+        self.scope = scope
+        self.db_statements = 0
+        self.db_time = 0.0
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def path(self) -> str:
+        return self.scope["path"]
+
+    @property
+    def route(self) -> Optional[str]:
+        """Route template (e.g. /api/v1/tasks/{task_id}), once the router has matched one"""
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+
+# Context of the request being served by the current task, if any
+current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+# Requests being served, by the task serving them, for code running outside
+# the request's task (e.g. the loop lag monitor's watchdog thread)
+active_requests: Dict["asyncio.Task", RequestContext] = {}
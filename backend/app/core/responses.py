@@ -0,0 +1,222 @@
+"""Response classes: fast JSON and content-negotiated binary formats"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Iterator, Optional, Type
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is not offered without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # CBOR is not offered without it
+    cbor2 = None
+
+# Load environment variables
+load_dotenv()
+
+# Opt in to orjson encoding by default and to the row-based fast path of
+# list endpoints, which skips ORM loading and per-object validation
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when it is installed.
+    Content must already be JSON-compatible apart from datetimes; it is
+    not passed through FastAPI's jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def get_default_response_class():
+    """Response class the app should use by default"""
+    if FAST_JSON_RESPONSES and orjson is not None:
+        from fastapi.responses import ORJSONResponse
+        return ORJSONResponse
+    return JSONResponse
+
+
+class BinaryResponse(StreamingResponse):
+    """
+    Base class for binary encodings of API responses.
+    List content is streamed in chunks of items, so the whole encoded body
+    is never held in memory at once; other content is sent in one piece.
+    """
+
+    # Number of list items encoded per chunk
+    chunk_size = 1024
+
+    def __init__(self, content: Any = None, status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+                 media_type: Optional[str] = None, background=None):
+        if status_code < 200 or status_code in (204, 304):
+            chunks: Iterator[bytes] = iter(())
+        elif isinstance(content, list):
+            chunks = self.iter_list(content)
+        else:
+            encoded = self.encode(content)
+            chunks = iter((encoded,))
+            headers = dict(headers or {}, **{"content-length": str(len(encoded))})
+        super().__init__(_iterate(chunks), status_code=status_code, headers=headers,
+                         media_type=media_type, background=background)
+
+    def encode(self, content: Any) -> bytes:
+        raise NotImplementedError
+
+    def iter_list(self, items: list) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+async def _iterate(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    # Chunks are small enough to encode on the event loop; a sync iterator
+    # would make Starlette hop to the threadpool for every chunk
+    for chunk in chunks:
+        yield chunk
+
+
+class MsgPackResponse(BinaryResponse):
+    """MessagePack response; lists are streamed as an array header followed by items"""
+
+    media_type = "application/msgpack"
+
+    def encode(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default)
+
+    def iter_list(self, items: list) -> Iterator[bytes]:
+        packer = msgpack.Packer(default=_default)
+        yield packer.pack_array_header(len(items))
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            # Pack the chunk in one call and drop its own array header
+            yield packer.pack(chunk)[len(packer.pack_array_header(len(chunk))):]
+
+
+class CBORResponse(BinaryResponse):
+    """CBOR response; lists are streamed as an indefinite-length array"""
+
+    media_type = "application/cbor"
+
+    def encode(self, content: Any) -> bytes:
+        return cbor2.dumps(_isoformat_datetimes(content))
+
+    def iter_list(self, items: list) -> Iterator[bytes]:
+        yield b"\x9f"
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            # Encode the chunk in one call and drop its definite-length array header
+            yield cbor2.dumps(_isoformat_datetimes(chunk))[_cbor_array_header_size(len(chunk)):]
+        yield b"\xff"
+
+
+def _cbor_array_header_size(length: int) -> int:
+    if length < 24:
+        return 1
+    if length < 1 << 8:
+        return 2
+    if length < 1 << 16:
+        return 3
+    return 5 if length < 1 << 32 else 9
+
+
+def _isoformat_datetimes(value: Any) -> Any:
+    """
+    Replace datetimes and dates with ISO strings, as in the JSON and
+    MessagePack bodies. cbor2 encodes datetimes itself (and refuses naive
+    ones), so a default hook is never reached for them.
+    """
+    if isinstance(value, list):
+        return [_isoformat_datetimes(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _isoformat_datetimes(item) for key, item in value.items()}
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# Binary media types clients may ask for, mapped to their response classes
+BINARY_RESPONSE_CLASSES: Dict[str, Type[BinaryResponse]] = {}
+if msgpack is not None:
+    BINARY_RESPONSE_CLASSES["application/msgpack"] = MsgPackResponse
+    BINARY_RESPONSE_CLASSES["application/x-msgpack"] = MsgPackResponse
+if cbor2 is not None:
+    BINARY_RESPONSE_CLASSES["application/cbor"] = CBORResponse
+
+
+def negotiate_media_type(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick a binary media type from an Accept header
+    :param accept: Accept header value
+    :return: The preferred supported binary media type, or None for JSON
+    """
+    if not accept or ("/json" in accept and "," not in accept):
+        return None
+    best, best_quality = None, 0.0
+    for position, part in enumerate(accept.split(",")):
+        media_type, _, params = part.strip().partition(";")
+        media_type = media_type.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # Earlier entries win ties, as JSON does against "*/*"
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best if best in BINARY_RESPONSE_CLASSES else None
+
+
+def negotiated_response_class(request: Request, default: Type[Response] = FastJSONResponse) -> Type[Response]:
+    """Response class for a request's Accept header, for handlers that build responses themselves"""
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    return BINARY_RESPONSE_CLASSES[media_type] if media_type else default
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route that serves MessagePack or CBOR when the client's Accept header
+    asks for it, and JSON otherwise. A request handler is built per format
+    up front, so negotiation is a single header lookup per request.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        default_handler = super().get_route_handler()
+        response_class = self.response_class
+        handlers = {}
+        for media_type, binary_class in BINARY_RESPONSE_CLASSES.items():
+            self.response_class = binary_class
+            handlers[media_type] = super().get_route_handler()
+        self.response_class = response_class
+
+        async def handler(request: Request) -> Response:
+            media_type = negotiate_media_type(request.headers.get("accept"))
+            response = await handlers.get(media_type, default_handler)(request)
+            response.headers["vary"] = "Accept"
+            return response
+
+        return handler
@@ -0,0 +1,153 @@
+"""Token revocation list held in memory and synced from the database"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.logging_config import logger
+from app.models import RevokedToken
+
+# Load environment variables
+load_dotenv()
+
+# How often each worker reloads the revocation list from the database
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "30"))
+# Keep only a Bloom filter in memory and confirm positives in the database
+REVOCATION_BLOOM_FILTER = os.getenv("REVOCATION_BLOOM_FILTER", "false").lower() == "true"
+REVOCATION_BLOOM_BITS = int(os.getenv("REVOCATION_BLOOM_BITS", str(1 << 20)))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys"""
+
+    def __init__(self, size_bits: int = 1 << 20, num_hashes: int = 4):
+        """
+        Initialize the filter
+        :param size_bits: Number of bits in the filter
+        :param num_hashes: Number of bit positions set per key
+        """
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.num_hashes).digest()
+        for i in range(self.num_hashes):
+            yield int.from_bytes(digest[i * 8:(i + 1) * 8], "little") % self.size_bits
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    In-memory set of revoked token IDs (jti).
+    Lookups never touch the database, except in Bloom filter mode where a
+    positive match is confirmed with a single indexed query.
+    """
+
+    def __init__(self, use_bloom_filter: bool = False, bloom_bits: int = 1 << 20):
+        self.use_bloom_filter = use_bloom_filter
+        self.bloom_bits = bloom_bits
+        self._jtis: Set[str] = set()
+        self._bloom: Optional[BloomFilter] = BloomFilter(bloom_bits) if use_bloom_filter else None
+        self._count = 0
+        # Token IDs added while a sync's query runs, kept so the reload
+        # does not drop them; None when no sync is running
+        self._added_during_sync: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    def _load(self, jtis: Iterable[str]) -> None:
+        jtis = set(jtis)
+        if self.use_bloom_filter:
+            bloom = BloomFilter(self.bloom_bits)
+            for jti in jtis:
+                bloom.add(jti)
+            self._bloom = bloom
+        else:
+            self._jtis = jtis
+        self._count = len(jtis)
+
+    def add(self, jti: str) -> None:
+        """Mark a token ID as revoked in this process"""
+        with self._lock:
+            if self._added_during_sync is not None:
+                self._added_during_sync.add(jti)
+            if self._bloom is not None:
+                # A Bloom filter false positive leaves the count one short
+                if jti not in self._bloom:
+                    self._count += 1
+                self._bloom.add(jti)
+            elif jti not in self._jtis:
+                self._jtis.add(jti)
+                self._count += 1
+
+    def is_revoked(self, jti: Optional[str], db: Optional[Session] = None) -> bool:
+        """
+        Check whether a token ID has been revoked
+        :param jti: Token ID claim (tokens without one cannot be revoked)
+        :param db: Session used to confirm Bloom filter matches
+        """
+        if jti is None:
+            return False
+        if self._bloom is None:
+            return jti in self._jtis
+        if jti not in self._bloom:
+            return False
+        if db is None:
+            return True
+        return db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+
+    def sync(self, db: Session) -> None:
+        """
+        Reload unexpired revocations from the database, keeping those added
+        in this process while the query ran
+        """
+        with self._lock:
+            self._added_during_sync = set()
+        try:
+            rows = db.query(RevokedToken.jti).filter(RevokedToken.expires_at > datetime.utcnow()).all()
+        except Exception:
+            with self._lock:
+                self._added_during_sync = None
+            raise
+        with self._lock:
+            self._load({row.jti for row in rows} | self._added_during_sync)
+            self._added_during_sync = None
+
+    def __len__(self) -> int:
+        """Number of revoked token IDs held (approximate in Bloom filter mode)"""
+        return self._count
+
+
+revocation_list = RevocationList(REVOCATION_BLOOM_FILTER, REVOCATION_BLOOM_BITS)
+
+
+def _sync_once() -> None:
+    db = SessionLocal()
+    try:
+        revocation_list.sync(db)
+    finally:
+        db.close()
+
+
+async def run_revocation_sync(interval: float = REVOCATION_SYNC_SECONDS) -> None:
+    """Periodically reload the revocation list so revocations made by other workers apply here"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await loop.run_in_executor(None, _sync_once)
+        except Exception as e:
+            logger.warning(f"Revocation list sync failed: {str(e)}")
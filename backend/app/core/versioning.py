@@ -1,8 +1,7 @@
 """API versioning module for the Smart Task Manager"""
 
-from typing import Callable, Dict, Type
-from fastapi import APIRouter, FastAPI, Request, Response
-from fastapi.routing import APIRoute
+from typing import Dict, Optional
+from fastapi import APIRouter, FastAPI
 from app.core.logging_config import logger
 
 class VersionedAPIRouter(APIRouter):
@@ -61,22 +60,15 @@ def include_api_versions(app: FastAPI) -> None:
         app.include_router(router)
         logger.info(f"Registered API version: {version}")
 
-class VersionHeaderMiddleware:
-    """Middleware to add API version header to responses"""
-    
-    def __init__(self, app: FastAPI):
-        self.app = app
-    
-    async def __call__(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Add API version header based on path
-        path = request.url.path
-        if path.startswith("/api/"):
-            parts = path.split("/")
-            if len(parts) > 2 and parts[2].startswith("v"):
-                response.headers["X-API-Version"] = parts[2]
-            else:
-                response.headers["X-API-Version"] = "v1"
-        
-        return response
+def get_api_version(path: str) -> Optional[str]:
+    """
+    Get the API version a request path belongs to
+    :param path: Request path
+    :return: Version (e.g. 'v1') for /api/ paths, None otherwise
+    """
+    if not path.startswith("/api/"):
+        return None
+    parts = path.split("/")
+    if len(parts) > 2 and parts[2].startswith("v"):
+        return parts[2]
+    return "v1"
@@ -0,0 +1,169 @@
+"""Warm-up run at startup so the first real requests are not the slow ones"""
+
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.auth import get_current_active_user
+from app.core.logging_config import logger
+from app.models import User
+
+# Load environment variables
+load_dotenv()
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Pooled connections opened ahead of traffic (capped at the pool size)
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "5"))
+# Read-only routes requested once each with a synthetic user
+WARMUP_ROUTES = [
+    route.strip()
+    for route in os.getenv("WARMUP_ROUTES", "/api/v1/tasks,/api/v1/priorities,/api/v1/users/me").split(",")
+    if route.strip()
+]
+
+
+class WarmupState:
+    """Progress of the warm-up, reported by the readiness endpoint"""
+
+    def __init__(self):
+        self.complete = False
+        self.steps: Dict[str, float] = {}
+        self.errors: List[str] = []
+
+    def reset(self) -> None:
+        self.complete = False
+        self.steps = {}
+        self.errors = []
+
+    def report(self) -> Dict:
+        return {
+            "complete": self.complete,
+            "steps": {name: round(seconds, 4) for name, seconds in self.steps.items()},
+            "errors": list(self.errors),
+        }
+
+
+warmup_state = WarmupState()
+
+
+def _open_connections(engine: Engine, count: int) -> int:
+    """Check out up to count connections at once so the pool holds them when they are returned"""
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        count = min(count, pool_size())
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def _warm_schemas(app: FastAPI) -> None:
+    """Generate the OpenAPI document, which builds and caches the JSON schema of every model"""
+    app.openapi()
+
+
+async def _request(app: FastAPI, path: str) -> int:
+    """
+    Send a GET straight to the router, skipping the middleware so the
+    request is not rate limited, logged or counted in the metrics
+    :return: Response status code
+    """
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("warmup", 80),
+        "client": ("127.0.0.1", 0),
+        "root_path": "",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"warmup"), (b"accept", b"application/json")],
+        "app": app,
+    }
+    status = 500
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    # FastAPI's own exit stack middleware normally provides this, for
+    # dependencies with yield (e.g. get_db)
+    async with AsyncExitStack() as stack:
+        scope["fastapi_astack"] = stack
+        await app.router(scope, receive, send)
+    return status
+
+
+async def _synthetic_requests(app: FastAPI, paths: List[str]) -> None:
+    """
+    Request each route once as a synthetic user that owns nothing, so
+    dependencies, queries and response serialization all run once.
+    Must only run before the app serves traffic, since it overrides the
+    current user dependency while it runs.
+    """
+    warmup_user = User(id=0, username="warmup", email=None, created_at=datetime.utcnow())
+    previous = app.dependency_overrides.get(get_current_active_user)
+    app.dependency_overrides[get_current_active_user] = lambda: warmup_user
+    try:
+        for path in paths:
+            status = await _request(app, path)
+            if status >= 400:
+                raise RuntimeError(f"GET {path} returned {status}")
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_current_active_user, None)
+        else:
+            app.dependency_overrides[get_current_active_user] = previous
+
+
+async def warm_up(app: FastAPI, engine: Engine, connections: int = WARMUP_CONNECTIONS,
+                  routes: Optional[List[str]] = None) -> Dict:
+    """
+    Prime the connection pool, model schemas and hot routes. A failing step
+    is logged and skipped rather than blocking startup.
+    :param app: FastAPI application
+    :param engine: Engine whose pool is filled
+    :param connections: Connections to open
+    :param routes: Paths requested once each, defaults to WARMUP_ROUTES
+    :return: Warm-up report
+    """
+    warmup_state.reset()
+    loop = asyncio.get_running_loop()
+    steps = [
+        ("connections", lambda: loop.run_in_executor(None, _open_connections, engine, connections)),
+        ("schemas", lambda: loop.run_in_executor(None, _warm_schemas, app)),
+        ("requests", lambda: _synthetic_requests(app, WARMUP_ROUTES if routes is None else routes)),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            warmup_state.errors.append(f"{name}: {e!r}")
+            logger.warning(f"Warm-up step {name} failed: {e!r}")
+        warmup_state.steps[name] = time.perf_counter() - start
+    warmup_state.complete = True
+    logger.info(f"Warm-up complete in {sum(warmup_state.steps.values()):.3f}s")
+    return warmup_state.report()
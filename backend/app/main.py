@@ -1,16 +1,24 @@
 import os
-import json
-from fastapi import FastAPI, Depends, Request, Response, status
+import asyncio
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-import time
-import uuid
 from dotenv import load_dotenv
 
-from app.api import api_router
-from app.core.database import engine, get_db, Base
-from app.core.logging_config import logger
-from app.core.versioning import include_api_versions, VersionHeaderMiddleware, get_api_router, api_versions
+from app.api import include_api_routers
+from app.api.priorities import sync_priorities_to_shards
+from app.core.archival import ARCHIVAL_ENABLED, run_archival
+from app.core.database import (
+    DB_CREATE_TABLES, Base, connect_with_retry, create_shard_tables, engine, get_db, pool_status,
+    shard_router
+)
+from app.core.loop_monitor import loop_monitor
+from app.core.memory import run_memory_sampler
+from app.core.metrics import CONTENT_TYPE, render_metrics
+from app.core.revocation import revocation_list, run_revocation_sync
+from app.core.middleware import RequestMiddleware
+from app.core.responses import get_default_response_class
+from app.core.versioning import include_api_versions, api_versions
+from app.core.warmup import WARMUP_ENABLED, warm_up, warmup_state
 from app.models import Priority
 
 # Load environment variables
@@ -21,6 +29,7 @@ app = FastAPI(
     title="AI-Powered Smart Task Manager",
     description="A task management API with AI prioritization capabilities",
     version="0.1.0",
+    default_response_class=get_default_response_class(),
 )
 
 # Configure CORS
@@ -33,70 +42,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    start_time = time.time()
-    
-    # Add request_id to log context
-    logger.info(f"Request started: {request.method} {request.url.path}", 
-                extra={"request_id": request_id})
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    logger.info(f"Request completed: {request.method} {request.url.path} - Status: {response.status_code} - Duration: {process_time:.3f}s",
-                extra={"request_id": request_id})
-    
-    # Add request ID to response headers
-    response.headers["X-Request-ID"] = request_id
-    
-    return response
-
-# Add rate limiting middleware
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    from app.core.rate_limit import general_rate_limiter, auth_rate_limiter
-    
-    # Skip rate limiting for certain paths if needed
-    path = request.url.path
-    
-    # Apply stricter rate limiting for authentication endpoints
-    if path.startswith("/api/auth"):
-        if not await auth_rate_limiter.check_rate_limit(request.client.host):
-            logger.warning(f"Auth rate limit exceeded for {request.client.host}")
-            return Response(
-                content=json.dumps({"detail": "Authentication rate limit exceeded"}),
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                media_type="application/json"
-            )
-    # Apply general rate limiting for all other endpoints
-    else:
-        if not await general_rate_limiter.check_rate_limit(request.client.host):
-            logger.warning(f"General rate limit exceeded for {request.client.host}")
-            return Response(
-                content=json.dumps({"detail": "Rate limit exceeded. Please try again later."}),
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                media_type="application/json"
-            )
-    
-    response = await call_next(request)
-    return response
-
-# Add version header middleware
-app.add_middleware(VersionHeaderMiddleware)
+# Request IDs, rate limiting, version headers and request logging, in one
+# pure ASGI middleware (outermost, so rejected requests are cheap)
+app.add_middleware(RequestMiddleware)
 
 # Include versioned API routers
 include_api_versions(app)
 
-# Include API router for backward compatibility during migration
-app.include_router(api_router)
+# Mount the route modules under each API version, and under /api for
+# backward compatibility during migration
+include_api_routers(app)
 
 # Create database tables on startup if they don't exist
 @app.on_event("startup")
 async def startup_event():
-    Base.metadata.create_all(bind=engine)
+    # Wait for the database without blocking the loop, then create tables
+    await connect_with_retry(engine)
+    for shard_engine in shard_router.engines.values():
+        await connect_with_retry(shard_engine)
+    if DB_CREATE_TABLES:
+        Base.metadata.create_all(bind=engine)
+        for shard_engine in shard_router.engines.values():
+            create_shard_tables(shard_engine)
     
     # Seed priorities if they don't exist
     db = next(get_db())
@@ -109,12 +76,62 @@ async def startup_event():
         for p in priorities:
             db.add(Priority(**p))
         db.commit()
+    sync_priorities_to_shards(db)
+    
+    # Load token revocations and keep the in-memory list in sync
+    revocation_list.sync(db)
+    # Return the connection to the pool rather than holding it for good
+    db.close()
+    app.state.revocation_sync = asyncio.create_task(run_revocation_sync())
+    
+    # Watch for handlers blocking the event loop
+    app.state.loop_monitor = asyncio.create_task(loop_monitor.run())
+    
+    # Keep the RSS and object count gauges up to date
+    app.state.memory_sampler = asyncio.create_task(run_memory_sampler())
+    
+    # Move old completed tasks out of the hot tasks table
+    app.state.archival = asyncio.create_task(run_archival()) if ARCHIVAL_ENABLED else None
+    
+    # Fill the pool, build the model schemas and run the hot routes once
+    # (which also loads the priority cache) before taking traffic; the
+    # server only starts accepting connections once this returns
+    if WARMUP_ENABLED:
+        await warm_up(app, engine)
+    else:
+        warmup_state.complete = True
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.revocation_sync.cancel()
+    app.state.loop_monitor.cancel()
+    app.state.memory_sampler.cancel()
+    if app.state.archival is not None:
+        app.state.archival.cancel()
 
 # Health check endpoint
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+# Readiness endpoint: ready once the warm-up has completed, and not while
+# every pooled connection is in use (answers without touching the database)
+@app.get("/ready")
+async def ready(response: Response):
+    if not warmup_state.complete:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming_up"}
+    pool = pool_status(engine)
+    if pool["exhausted"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "pool_exhausted", "pool": pool}
+    return {"status": "ready", "warmup": warmup_state.report(), "pool": pool}
+
+# Metrics endpoint (Prometheus text format)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -1,8 +1,8 @@
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
-Base = declarative_base()
+from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -29,6 +29,9 @@ class Priority(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Never reuse the ID of a deleted or archived task (SQLite otherwise
+    # hands out max(id) + 1), so archived and live IDs cannot collide
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -55,3 +58,39 @@ class TaskDependency(Base):
 
     task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies")
     dependent_task = relationship("Task", foreign_keys=[dependent_task_id], back_populates="dependents")
+
+
+class ArchivedTask(Base):
+    """Completed task moved out of tasks by the archival job, keeping its ID"""
+    __tablename__ = "archived_tasks"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(String)
+    status = Column(String)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    priority_id = Column(Integer, ForeignKey("priorities.id"))
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    due_date = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    priority = relationship("Priority")
+
+
+class ArchivedTaskDependency(Base):
+    """Dependency of an archived task; either side may still be a live task"""
+    __tablename__ = "archived_task_dependencies"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, index=True)
+    dependent_task_id = Column(Integer, index=True)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
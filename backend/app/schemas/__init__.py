@@ -107,6 +107,45 @@ class TaskDependency(TaskDependencyCreate):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+
+# Diagnostics Schemas
+class ProfileInfo(BaseModel):
+    name: str
+    method: str
+    path: str
+    request_id: str
+    captured_at: datetime
+    size: int
+
+class LoopStall(BaseModel):
+    detected_at: datetime
+    lag: float
+    route: str
+    request_id: Optional[str] = None
+    stack: str
+
+class TracemallocStatus(BaseModel):
+    tracing: bool
+
+class MemoryModuleStats(BaseModel):
+    module: str
+    size: int
+    size_diff: int
+    count: int
+    count_diff: int
+
+class MemoryAllocationSite(MemoryModuleStats):
+    location: str
+
+class MemoryReport(BaseModel):
+    traced_bytes: int
+    traced_peak_bytes: int
+    modules: List[MemoryModuleStats]
+    sites: List[MemoryAllocationSite]
@@ -4,11 +4,8 @@ import os
 import datetime
 from typing import List, Dict, Any, Optional
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+# The Google client libraries are imported where they are used: they are
+# slow to import and only needed once calendar sync is actually used.
 
 # Define the scopes required for Google Calendar API
 SCOPES = ['https://www.googleapis.com/auth/calendar']
@@ -35,6 +32,11 @@ class GoogleCalendarService:
         Returns:
             bool: True if authentication was successful, False otherwise
         """
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+
         creds = None
         
         # Load existing token if it exists
@@ -80,6 +82,8 @@ class GoogleCalendarService:
         Returns:
             List[Dict[str, Any]]: List of calendar details
         """
+        from googleapiclient.errors import HttpError
+
         if not self.service:
             if not self.authenticate():
                 return []
@@ -109,6 +113,8 @@ class GoogleCalendarService:
         Returns:
             Optional[Dict[str, Any]]: Created event details or None if failed
         """
+        from googleapiclient.errors import HttpError
+
         if not self.service:
             if not self.authenticate():
                 return None
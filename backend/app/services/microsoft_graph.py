@@ -1,10 +1,11 @@
 import os
-import requests
 import json
 import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+# requests is imported where it is used, so importing this module stays cheap
+
 """
 ---------------------------------------------------------------------------
                     NOVUMSOLVO PROPRIETARY SOFTWARE
@@ -95,6 +96,8 @@ class MicrosoftGraphService:
         }
         
         try:
+            import requests
+
             response = requests.post(token_url, data=token_data)
             response.raise_for_status()
             
@@ -149,6 +152,8 @@ class MicrosoftGraphService:
         }
         
         try:
+            import requests
+
             response = requests.post(token_url, data=token_data)
             response.raise_for_status()
             
@@ -201,7 +206,8 @@ class MicrosoftGraphService:
             'Authorization': f"Bearer {self.token['access_token']}",
             'Content-Type': 'application/json'
         }
-      def __extract_intelligence_metadata(self, content: str) -> Dict[str, Any]:
+
+    def __extract_intelligence_metadata(self, content: str) -> Dict[str, Any]:
         """
         NOVUMSOLVO Proprietary Intelligence Extraction Algorithm
         
@@ -232,6 +238,8 @@ class MicrosoftGraphService:
             Optional[Dict[str, Any]]: Created task data or None if failed
         """
         try:
+            import requests
+
             # Proprietary intelligence extraction
             metadata = self.__extract_intelligence_metadata(email_data.get('body', ''))
             
@@ -281,6 +289,8 @@ class MicrosoftGraphService:
             bool: True if notification was sent successfully
         """
         try:
+            import requests
+
             headers = self.get_headers()
             endpoint = f"{self.api_base_url}/me/sendMail"
             
@@ -332,6 +342,8 @@ class MicrosoftGraphService:
             List[Dict[str, Any]]: List of email data
         """
         try:
+            import requests
+
             headers = self.get_headers()
             endpoint = f"{self.api_base_url}/me/messages"
             params = {
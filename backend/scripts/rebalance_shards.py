@@ -0,0 +1,221 @@
+# Task shard rebalancing script
+#
+# Moves each user's tasks, archived tasks and their dependencies to the shard the hash ring
+# assigns them (see ShardRouter in app/core/database.py), e.g. after adding
+# a shard to DATABASE_SHARD_URLS. Run from the backend directory:
+#
+#   python -m scripts.rebalance_shards             move every misplaced user
+#   python -m scripts.rebalance_shards 12 40       move only these user IDs
+#   python -m scripts.rebalance_shards --dry-run   list moves without making them
+#   python -m scripts.rebalance_shards --allow-renumber
+#                                                  give tasks new IDs where the target
+#                                                  shard already uses theirs
+#
+# Run it with writes stopped (e.g. the API scaled down or in maintenance
+# mode). A user's task rows are locked while they are moved where the
+# database supports it (SELECT ... FOR UPDATE), but tasks created during
+# the move stay behind and are picked up by the next run. A move
+# interrupted after the copy is committed leaves the rows on both shards;
+# rerunning the script replaces the copies and finishes the move.
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, distinct, func, insert, or_, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.database import ShardRouter, shard_router
+from app.models import ArchivedTask, ArchivedTaskDependency, Task, TaskDependency
+
+tasks_table = Task.__table__
+dependencies_table = TaskDependency.__table__
+archived_table = ArchivedTask.__table__
+archived_dependencies_table = ArchivedTaskDependency.__table__
+
+class IdCollision(Exception):
+    """Raised when tasks being moved have IDs the target shard uses for other users' tasks"""
+
+def find_misplaced_owners(router: ShardRouter, owner_ids: Optional[List[int]] = None) -> List[Tuple[int, str, str]]:
+    """
+    Find users whose tasks are on a shard other than the one the ring assigns
+    :param router: Shard router
+    :param owner_ids: Only check these users
+    :return: (owner ID, current shard, target shard) for each move needed
+    """
+    moves = []
+    for name, engine in router.engines.items():
+        owners = set()
+        with engine.connect() as connection:
+            for table in (tasks_table, archived_table):
+                query = select(distinct(table.c.owner_id))
+                if owner_ids is not None:
+                    query = query.where(table.c.owner_id.in_(owner_ids))
+                owners.update(connection.execute(query).scalars())
+        for owner_id in sorted(owners):
+            target = router.shard_for(owner_id)
+            if target != name:
+                moves.append((owner_id, name, target))
+    return moves
+
+def _highest_task_id(connection: Connection) -> int:
+    """Highest live or archived task ID (the two share one ID space)"""
+    return max(connection.execute(select(func.max(table.c.id))).scalar() or 0
+               for table in (tasks_table, archived_table))
+
+def _advance_task_id_sequence(connection: Connection) -> None:
+    """
+    Make the target's next task ID larger than every live and archived
+    task ID it holds: rows copied with explicit IDs do not advance a
+    PostgreSQL sequence, and archived IDs never advance SQLite's
+    AUTOINCREMENT counter
+    """
+    highest = _highest_task_id(connection)
+    if not highest:
+        return
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT setval(pg_get_serial_sequence('tasks', 'id'), :highest)"),
+                           {"highest": highest})
+    elif connection.dialect.name == "sqlite" and connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'")
+    ).first() is not None:
+        updated = connection.execute(text("UPDATE sqlite_sequence SET seq = max(seq, :highest) WHERE name = 'tasks'"),
+                                     {"highest": highest})
+        if updated.rowcount == 0:
+            connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :highest)"),
+                               {"highest": highest})
+
+def _involving(table, ids: List[int]):
+    return or_(table.c.task_id.in_(ids), table.c.dependent_task_id.in_(ids))
+
+def move_owner_tasks(owner_id: int, source: Engine, target: Engine,
+                     allow_renumber: bool = False) -> Tuple[Dict[int, int], List[Tuple[int, int]]]:
+    """
+    Move a user's tasks, archived tasks and their dependencies from one
+    shard to another. The source transaction stays open, holding the rows
+    read, until exactly those rows are deleted. Copies on the target left
+    by an interrupted move of the same tasks are replaced.
+    Task IDs are kept. If the target uses one for another user's live or
+    archived task the move is refused, unless allow_renumber is set: then
+    the task gets a new ID, and clients holding its old URL will no longer
+    find it.
+    :param owner_id: ID of the user whose tasks are moved
+    :param source: Engine of the shard the tasks are on
+    :param target: Engine of the shard they move to
+    :param allow_renumber: Give colliding tasks new IDs instead of refusing
+    :return: Old task ID to new task ID for every live and archived task
+             moved, and the dependencies (task ID, dependent task ID) not
+             copied because one side is not among the moved tasks
+    """
+    with source.begin() as source_connection:
+        tasks = source_connection.execute(
+            select(tasks_table).where(tasks_table.c.owner_id == owner_id).with_for_update()
+        ).mappings().all()
+        archived = source_connection.execute(
+            select(archived_table).where(archived_table.c.owner_id == owner_id).with_for_update()
+        ).mappings().all()
+        task_ids = [task["id"] for task in tasks]
+        all_ids = task_ids + [task["id"] for task in archived]
+        if not all_ids:
+            return {}, []
+        dependencies = source_connection.execute(
+            select(dependencies_table).where(_involving(dependencies_table, task_ids)).with_for_update()
+        ).mappings().all()
+        archived_dependencies = source_connection.execute(
+            select(archived_dependencies_table).where(_involving(archived_dependencies_table, all_ids)).with_for_update()
+        ).mappings().all()
+
+        id_map: Dict[int, int] = {}
+        skipped: List[Tuple[int, int]] = []
+        with target.begin() as target_connection:
+            # Copies of these tasks from an interrupted move are replaced
+            stale = []
+            for table in (tasks_table, archived_table):
+                stale += target_connection.execute(select(table.c.id).where(
+                    table.c.id.in_(all_ids), table.c.owner_id == owner_id
+                )).scalars().all()
+            if stale:
+                for table in (dependencies_table, archived_dependencies_table):
+                    target_connection.execute(delete(table).where(_involving(table, stale)))
+                for table in (tasks_table, archived_table):
+                    target_connection.execute(delete(table).where(table.c.id.in_(stale)))
+            taken = set()
+            for table in (tasks_table, archived_table):
+                taken.update(target_connection.execute(
+                    select(table.c.id).where(table.c.id.in_(all_ids))
+                ).scalars())
+            if taken and not allow_renumber:
+                raise IdCollision(f"task IDs {sorted(taken)} are used by other users on the target shard")
+
+            next_id = max(_highest_task_id(target_connection), max(all_ids)) + 1
+            for table, rows in ((tasks_table, tasks), (archived_table, archived)):
+                for row in rows:
+                    values = dict(row)
+                    if values["id"] in taken:
+                        values["id"] = next_id
+                        next_id += 1
+                    target_connection.execute(insert(table).values(**values))
+                    id_map[row["id"]] = values["id"]
+            for table, rows in ((dependencies_table, dependencies),
+                                (archived_dependencies_table, archived_dependencies)):
+                for dependency in rows:
+                    if dependency["task_id"] not in id_map or dependency["dependent_task_id"] not in id_map:
+                        skipped.append((dependency["task_id"], dependency["dependent_task_id"]))
+                        continue
+                    target_connection.execute(insert(table).values(
+                        task_id=id_map[dependency["task_id"]],
+                        dependent_task_id=id_map[dependency["dependent_task_id"]],
+                    ))
+            _advance_task_id_sequence(target_connection)
+
+        for table, rows in ((dependencies_table, dependencies),
+                            (archived_dependencies_table, archived_dependencies)):
+            source_connection.execute(delete(table).where(table.c.id.in_([row["id"] for row in rows])))
+        source_connection.execute(delete(tasks_table).where(tasks_table.c.id.in_(task_ids)))
+        source_connection.execute(delete(archived_table).where(archived_table.c.id.in_([row["id"] for row in archived])))
+    return id_map, skipped
+
+def rebalance(router: ShardRouter, owner_ids: Optional[List[int]] = None, dry_run: bool = False,
+              allow_renumber: bool = False) -> List[Tuple[int, str, str]]:
+    """
+    Move every misplaced user's tasks to their assigned shard. Users whose
+    task IDs collide on the target are reported and left in place, unless
+    allow_renumber is set.
+    :param router: Shard router
+    :param owner_ids: Only move these users
+    :param dry_run: Only report the moves
+    :param allow_renumber: Give colliding tasks new IDs instead of skipping the user
+    :return: Moves made (or needed, for a dry run)
+    """
+    moves = find_misplaced_owners(router, owner_ids)
+    if dry_run:
+        for owner_id, source, target in moves:
+            print(f"User {owner_id}: {source} -> {target}")
+        return moves
+
+    made = []
+    for owner_id, source, target in moves:
+        try:
+            id_map, skipped = move_owner_tasks(owner_id, router.engines[source], router.engines[target],
+                                               allow_renumber=allow_renumber)
+        except IdCollision as e:
+            print(f"User {owner_id}: not moved from {source} to {target}, {e} (use --allow-renumber)")
+            continue
+        made.append((owner_id, source, target))
+        renumbered = {old: new for old, new in id_map.items() if old != new}
+        print(f"User {owner_id}: moved {len(id_map)} tasks (live and archived) from {source} to {target}")
+        if renumbered:
+            print(f"  Renumbered tasks (old -> new): {renumbered}")
+        if skipped:
+            print(f"  Dependencies not copied, one side was not moved (task -> dependent): {skipped}")
+    return made
+
+if __name__ == "__main__":
+    if not shard_router.enabled:
+        print("No shards configured; set DATABASE_SHARD_URLS")
+        sys.exit(1)
+
+    flags = {"--dry-run", "--allow-renumber"}
+    dry_run = "--dry-run" in sys.argv[1:]
+    allow_renumber = "--allow-renumber" in sys.argv[1:]
+    owner_ids = [int(arg) for arg in sys.argv[1:] if arg not in flags] or None
+    moves = rebalance(shard_router, owner_ids, dry_run=dry_run, allow_renumber=allow_renumber)
+    print(f"{len(moves)} users {'to move' if dry_run else 'moved'}")
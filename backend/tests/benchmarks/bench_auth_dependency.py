@@ -0,0 +1,47 @@
+"""
+Microbenchmark of the authentication dependency.
+
+Compares JWT decoding and the full get_current_user dependency with the
+verified-token cache disabled vs enabled.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_auth_dependency
+"""
+
+import asyncio
+from datetime import timedelta
+
+from app.core.auth import create_access_token, decode_access_token, get_current_user, token_cache
+from app.core.database import get_db
+from app.main import app
+from tests.benchmarks.harness import benchmark_client, login, measure, report
+
+ITERATIONS = 20000
+
+
+def main():
+    with benchmark_client() as client:
+        login(client)
+        token = create_access_token({"sub": "benchuser"}, expires_delta=timedelta(minutes=30))
+        db = next(app.dependency_overrides[get_db]())
+        loop = asyncio.new_event_loop()
+
+        def decode():
+            decode_access_token(token)
+
+        def dependency():
+            loop.run_until_complete(get_current_user(token=token, db=db))
+
+        max_size = token_cache.max_size
+        for state, size in (("disabled", 0), ("enabled", max_size)):
+            token_cache.max_size = size
+            token_cache.clear()
+            report(f"decode_access_token (cache {state})", measure(decode, ITERATIONS))
+            report(f"get_current_user (cache {state})", measure(dependency, ITERATIONS))
+        token_cache.max_size = max_size
+        loop.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
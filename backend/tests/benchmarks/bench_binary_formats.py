@@ -0,0 +1,66 @@
+"""
+Compare JSON, MessagePack and CBOR for a 10k task list: encoded size,
+server-side encode time and client-side decode time.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_binary_formats
+"""
+
+import asyncio
+import json
+import time
+
+from app.core.responses import BINARY_RESPONSE_CLASSES, FastJSONResponse, cbor2, msgpack
+from tests.benchmarks.bench_task_list import seed_tasks
+from tests.benchmarks.harness import benchmark_client, login
+
+ITERATIONS = 20
+
+DECODERS = {"application/json": json.loads}
+if msgpack is not None:
+    DECODERS["application/msgpack"] = msgpack.unpackb
+if cbor2 is not None:
+    DECODERS["application/cbor"] = cbor2.loads
+
+
+async def encode(response_class, content) -> bytes:
+    """Render a response the way the server does, including streamed chunks"""
+    response = response_class(content)
+    if hasattr(response, "body_iterator"):
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return response.body
+
+
+async def timed_encode(response_class, content, iterations: int = ITERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await encode(response_class, content)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def timed(fn, iterations: int = ITERATIONS) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    with benchmark_client() as client:
+        headers = login(client)
+        seed_tasks(client.engine, "benchuser")
+        content = client.get("/api/v1/tasks", headers=headers).json()
+
+        classes = {"application/json": FastJSONResponse, **BINARY_RESPONSE_CLASSES}
+        for media_type, decode in DECODERS.items():
+            body = asyncio.run(encode(classes[media_type], content))
+            assert decode(body) == content
+            encode_ms = asyncio.run(timed_encode(classes[media_type], content))
+            decode_ms = timed(lambda: decode(body))
+            served = client.get("/api/v1/tasks", headers={**headers, "Accept": media_type})
+            assert served.headers["content-type"] == media_type
+            print(f"{media_type:<22} {len(body):>9} bytes  encode {encode_ms:7.1f} ms  decode {decode_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark task inserts from concurrent requests on an SQLite file, each
+committing on its own vs committed together by the group commit writer.
+Every simulated request inserts one task from the event loop; the own
+commit case runs each insert and commit in the thread pool, as a sync
+handler would.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_group_commit
+"""
+
+import asyncio
+import tempfile
+import time
+from functools import partial
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.group_commit import GroupCommitWriter, group_commit_batch_size
+from app.models import Priority, Task, User
+
+CONCURRENCY = (1, 8, 32)
+WRITES = 1000
+
+
+def insert_task(number: int, db: Session) -> None:
+    db.add(Task(title=f"Task {number}", status="open", owner_id=1, priority_id=1))
+
+
+def own_commit(engine, number: int) -> None:
+    with Session(bind=engine) as db:
+        insert_task(number, db)
+        db.commit()
+
+
+def setup(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as db:
+        db.add(Priority(name="High", weight=3))
+        db.add(User(username="benchuser", hashed_password="x"))
+        db.commit()
+    return engine
+
+
+async def run(engine, concurrency: int, grouped: bool) -> float:
+    loop = asyncio.get_running_loop()
+    writer = GroupCommitWriter(engine, window=0.002) if grouped else None
+    numbers = iter(range(WRITES))
+
+    async def client() -> None:
+        for number in numbers:
+            if writer is not None:
+                await writer.submit(partial(insert_task, number))
+            else:
+                await loop.run_in_executor(None, own_commit, engine, number)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return WRITES / (time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for concurrency in CONCURRENCY:
+            for label, grouped in (("own commit", False), ("group commit", True)):
+                engine = setup(f"{tmp}/{concurrency}_{grouped}.db")
+                batches_before = sum(group_commit_batch_size.labels().counts)
+                writes_per_second = asyncio.run(run(engine, concurrency, grouped))
+                batches = sum(group_commit_batch_size.labels().counts) - batches_before
+                detail = f"  commits {batches:5d}" if grouped else ""
+                print(f"concurrency {concurrency:3d}  {label:<13} writes/s {writes_per_second:8.1f}{detail}")
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark GET /tasks latency while a storm of logins is in progress.
+
+Requests run concurrently on one event loop, as they do in a uvicorn worker,
+so any bcrypt work done on the loop shows up directly in the GET latency and
+in the worst event-loop stall. On a single core the CPU is saturated either
+way; the loop stall is the number to compare there.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_login_storm
+"""
+
+import asyncio
+import time
+
+from tests.benchmarks.harness import async_benchmark_client, async_login, report, summarise
+
+READERS = 4
+READS_PER_READER = 100
+LOGINS = 40
+
+
+async def _read_tasks(client, headers, samples):
+    for _ in range(READS_PER_READER):
+        t0 = time.perf_counter()
+        await client.get("/api/v1/tasks", headers=headers)
+        samples.append(time.perf_counter() - t0)
+
+
+async def _watch_loop(stalls, done):
+    while not done.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - t0 - 0.001)
+
+
+async def _run_reads(client, headers, storm=None):
+    samples, stalls = [], []
+    done = asyncio.Event()
+    watcher = asyncio.ensure_future(_watch_loop(stalls, done))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_read_tasks(client, headers, samples) for _ in range(READERS)),
+        *(storm or []),
+    )
+    elapsed = time.perf_counter() - start
+    done.set()
+    await watcher
+    return summarise(samples, elapsed), max(stalls)
+
+
+def _report(label, result):
+    summary, worst_stall = result
+    report(label, summary)
+    print(f"{'':<40} worst event-loop stall {worst_stall * 1000:.1f} ms")
+
+
+async def main():
+    async with async_benchmark_client() as client:
+        headers = await async_login(client)
+        await async_login(client, username="stormuser")
+
+        _report("GET /tasks (idle)", await _run_reads(client, headers))
+        storm = [
+            client.post("/api/token", data={"username": "stormuser", "password": "Password123!"})
+            for _ in range(LOGINS)
+        ]
+        _report(f"GET /tasks (during {LOGINS} logins)", await _run_reads(client, headers, storm))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
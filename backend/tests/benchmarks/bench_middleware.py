@@ -0,0 +1,99 @@
+"""
+Benchmark middleware overhead on a trivial endpoint.
+
+Compares the previous stack of @app.middleware("http") layers (request
+logging, rate limiting, version header; reproduced here) against the
+single pure ASGI RequestMiddleware. Logging is disabled so the numbers
+show middleware overhead rather than log I/O.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_middleware
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.middleware import RequestMiddleware
+from app.core.rate_limit import rate_limit_policies
+from app.core.versioning import get_api_version
+from tests.benchmarks.harness import report, summarise
+
+REQUESTS = 5000
+CONCURRENCY = 10
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        start_time = time.time()
+        response = await call_next(request)
+        time.time() - start_time
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next):
+        await rate_limit_policies.check(request.scope)
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def version_header(request: Request, call_next):
+        response = await call_next(request)
+        version = get_api_version(request.url.path)
+        if version:
+            response.headers["X-API-Version"] = version
+        return response
+
+    return app
+
+
+def _asgi_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    app.add_middleware(RequestMiddleware)
+    return app
+
+
+async def _run(app):
+    samples = []
+
+    async def worker(client, count):
+        for _ in range(count):
+            t0 = time.perf_counter()
+            await client.get("/api/v1/ping")
+            samples.append(time.perf_counter() - t0)
+
+    async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+        await worker(client, 100)
+        samples.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)))
+        return summarise(samples, time.perf_counter() - start)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    for limiter in rate_limit_policies.limiters:
+        limiter.rate_limit = 10 ** 9
+    report("3 x @app.middleware('http')", asyncio.run(_run(_legacy_app())))
+    report("RequestMiddleware (pure ASGI)", asyncio.run(_run(_asgi_app())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Microbenchmark of the rate limiter with many distinct clients, for the
+in-process and shared-memory backends.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_rate_limiter
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from app.core.rate_limit import RateLimiter
+from app.core.rate_limit_backends import InMemoryBackend, SharedMemoryBackend
+
+CLIENTS = 100_000
+CHECKS = 500_000
+
+
+async def _run(limiter, client_ids):
+    check = limiter.check_rate_limit
+    start = time.perf_counter()
+    for i in range(CHECKS):
+        await check(client_ids[i % len(client_ids)])
+    return time.perf_counter() - start
+
+
+def main():
+    client_ids = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(CLIENTS)]
+    with tempfile.TemporaryDirectory() as directory:
+        backends = (
+            ("memory", lambda: InMemoryBackend(60)),
+            ("shm", lambda: SharedMemoryBackend(os.path.join(directory, f"table-{time.time()}"), slots=1 << 18)),
+        )
+        for name, make_backend in backends:
+            for label, ids in ((f"{CLIENTS} distinct clients", client_ids), ("1 hot client", client_ids[:1])):
+                limiter = RateLimiter(rate_limit=100, time_window=60, backend=make_backend())
+                elapsed = asyncio.run(_run(limiter, ids))
+                print(f"{name + ', ' + label:<40} {CHECKS / elapsed:>10.0f} checks/s"
+                      f"  {elapsed / CHECKS * 1e6:.2f} us/check")
+
+
+if __name__ == "__main__":
+    main()
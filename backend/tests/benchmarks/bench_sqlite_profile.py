@@ -0,0 +1,111 @@
+"""
+Benchmark concurrent task reads and writes on an SQLite file with the
+default settings and with the SQLite performance profile (WAL, a
+dedicated writer connection and a reader pool). Reader threads list a
+user's tasks while writer threads create tasks, each committing on its
+own.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_sqlite_profile
+"""
+
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import exc, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, RoutingSession, create_engines
+from app.models import Priority, Task, User
+
+TASKS = 2000
+READERS = 4
+WRITERS = 2
+DURATION = 5.0
+
+
+def seed(session_factory) -> int:
+    db = session_factory()
+    db.add_all(Priority(name=name, weight=weight) for name, weight in (("High", 3), ("Medium", 2), ("Low", 1)))
+    owner = User(username="benchuser", hashed_password="x")
+    db.add(owner)
+    db.flush()
+    due = datetime(2030, 1, 1)
+    db.add_all(
+        Task(title=f"Task {i}", description="Benchmark task " * 4, status="open",
+             owner_id=owner.id, priority_id=i % 3 + 1, due_date=due + timedelta(hours=i))
+        for i in range(TASKS)
+    )
+    db.commit()
+    owner_id = owner.id
+    db.close()
+    return owner_id
+
+
+def run(sqlite_performance: bool, path: str) -> dict:
+    engine, writer = create_engines(f"sqlite:///{path}", sqlite_performance=sqlite_performance)
+    Base.metadata.create_all(bind=writer or engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine,
+                                   class_=RoutingSession, writer=writer)
+    owner_id = seed(session_factory)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def count(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def reader() -> None:
+        query = select(Task.id, Task.title, Task.status, Task.priority_id).where(Task.owner_id == owner_id).limit(200)
+        while not stop.is_set():
+            db = session_factory()
+            try:
+                db.execute(query).all()
+                count("reads")
+            except exc.OperationalError:
+                count("errors")
+            finally:
+                db.close()
+
+    def writer_thread(number: int) -> None:
+        i = 0
+        while not stop.is_set():
+            db = session_factory()
+            try:
+                db.add(Task(title=f"Written {number}-{i}", status="open", owner_id=owner_id, priority_id=1))
+                db.commit()
+                count("writes")
+            except exc.OperationalError:
+                db.rollback()
+                count("errors")
+            finally:
+                db.close()
+            i += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    threads += [threading.Thread(target=writer_thread, args=(n,)) for n in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    if writer is not None:
+        writer.dispose()
+    return {key: value / DURATION for key, value in counts.items()}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, sqlite_performance in (("default", False), ("performance profile", True)):
+            result = run(sqlite_performance, f"{tmp}/{label.replace(' ', '_')}.db")
+            print(f"{label:<22} reads/s {result['reads']:9.1f}  writes/s {result['writes']:8.1f}  "
+                  f"errors/s {result['errors']:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark cold start: time to import the application and time to run its
+startup handlers, each measured in fresh interpreters. Also lists the
+slowest imports.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_startup
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+STARTUP_SCRIPT = """
+import asyncio, time
+import app.main
+
+async def startup():
+    start = time.perf_counter()
+    await app.main.app.router.startup()
+    elapsed = time.perf_counter() - start
+    await app.main.app.router.shutdown()
+    return elapsed
+
+print(asyncio.run(startup()))
+"""
+
+
+def run(script: str, env: dict) -> float:
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, count: int = 10):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                            env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/startup.db", LOG_LEVEL="WARNING")
+        imports = [run(IMPORT_SCRIPT, env) for _ in range(RUNS)]
+        startups = [run(STARTUP_SCRIPT, env) for _ in range(RUNS)]
+        print(f"{'import app.main':<40} median {statistics.median(imports) * 1000:8.1f} ms  max {max(imports) * 1000:8.1f} ms")
+        print(f"{'startup handlers':<40} median {statistics.median(startups) * 1000:8.1f} ms  max {max(startups) * 1000:8.1f} ms")
+        print("\nSlowest imports (self time):")
+        for self_us, cumulative_us, name in slowest_imports(env):
+            print(f"  {name:<40} self {self_us / 1000:7.1f} ms  cumulative {cumulative_us / 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark the Python-side cost per query of the hot task lookups: the
+query built from a db.query(...) chain on every call vs the cached lambda
+statement used by app/api/tasks.py. Runs against an in-memory SQLite
+database with a handful of rows, so the time is almost all statement
+construction, cache key generation and result processing.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_statement_cache
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from app.api.tasks import _dependency_stmt, _owned_task_stmt, _priority_stmt, _task_list_stmt
+from app.core.database import Base
+from app.models import Priority, Task, TaskDependency, User
+from tests.benchmarks.harness import measure, report
+
+ITERATIONS = 5000
+
+
+def seed(db: Session) -> None:
+    db.add(Priority(name="High", weight=3))
+    db.add(User(username="benchuser", hashed_password="x"))
+    db.flush()
+    db.add_all(Task(title=f"Task {i}", status="open", owner_id=1, priority_id=1) for i in range(20))
+    db.flush()
+    db.add(TaskDependency(task_id=1, dependent_task_id=2))
+    db.commit()
+
+
+def main():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = Session(bind=engine)
+    seed(db)
+
+    cases = [
+        ("task by id and owner",
+         lambda: db.query(Task).options(joinedload(Task.priority)).filter(Task.id == 5, Task.owner_id == 1).first(),
+         lambda: db.scalars(_owned_task_stmt(Task, 5, 1, with_priority=True)).first()),
+        ("tasks by owner and status",
+         lambda: db.query(Task).options(joinedload(Task.priority)).filter(Task.owner_id == 1).filter(Task.status == "open").all(),
+         lambda: db.scalars(_task_list_stmt(Task, 1, "open", None)).all()),
+        ("priority by id",
+         lambda: db.query(Priority).filter(Priority.id == 1).first(),
+         lambda: db.scalars(_priority_stmt(1)).first()),
+        ("dependency by tasks",
+         lambda: db.query(TaskDependency).filter(TaskDependency.task_id == 1, TaskDependency.dependent_task_id == 2).first(),
+         lambda: db.scalars(_dependency_stmt(1, 2)).first()),
+    ]
+    for name, query_chain, cached_statement in cases:
+        for label, fn in (("chain", query_chain), ("lambda", cached_statement)):
+            fn()  # Fill the compiled cache before measuring
+            report(f"{name} ({label})", measure(fn, ITERATIONS))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark GET /tasks on a large task list with the regular ORM path and
+the row-based orjson fast path, reporting throughput in bytes/s and CPU
+time per response.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_task_list
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core import responses
+from app.models import Task, User
+from tests.benchmarks.harness import benchmark_client, login
+
+TASKS = 10000
+ITERATIONS = 20
+
+
+def seed_tasks(engine, username: str) -> None:
+    db = Session(bind=engine)
+    owner = db.query(User).filter(User.username == username).one()
+    due = datetime(2030, 1, 1)
+    db.add_all(
+        Task(title=f"Task {i}", description="Benchmark task " * 4, status="open",
+             owner_id=owner.id, priority_id=i % 3 + 1, due_date=due + timedelta(hours=i))
+        for i in range(TASKS)
+    )
+    db.commit()
+    db.close()
+
+
+def main():
+    with benchmark_client() as client:
+        headers = login(client)
+        seed_tasks(client.engine, "benchuser")
+
+        fast = responses.FAST_JSON_RESPONSES
+        for label, enabled in (("GET /tasks (ORM + pydantic)", False), ("GET /tasks (Core rows + orjson)", True)):
+            responses.FAST_JSON_RESPONSES = enabled
+            size = 0
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            for _ in range(ITERATIONS):
+                size += len(client.get("/api/v1/tasks", headers=headers).content)
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+            print(f"{label:<40} {size / wall / 1e6:>8.1f} MB/s"
+                  f"  CPU {cpu / ITERATIONS * 1000:.1f} ms/response  ({size // ITERATIONS} bytes)")
+        responses.FAST_JSON_RESPONSES = fast
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark authenticated GET /tasks throughput with and without the user cache.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_user_cache
+"""
+
+from sqlalchemy import event
+
+from app.core.auth import user_cache
+from tests.benchmarks.harness import benchmark_client, login, measure, report
+
+ITERATIONS = 2000
+
+
+def main():
+    with benchmark_client() as client:
+        headers = login(client)
+        user_selects = {"count": 0}
+
+        @event.listens_for(client.engine, "before_cursor_execute")
+        def count_user_selects(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("SELECT") and "FROM users" in statement:
+                user_selects["count"] += 1
+
+        def get_tasks():
+            client.get("/api/v1/tasks", headers=headers)
+
+        max_size = user_cache.max_size
+        for label, size in (("GET /tasks (user cache disabled)", 0), ("GET /tasks (user cache enabled)", max_size)):
+            user_cache.max_size = size
+            user_cache.clear()
+            user_selects["count"] = 0
+            report(label, measure(get_tasks, ITERATIONS))
+            print(f"{'':<40} users SELECTs: {user_selects['count']}  cache: {user_cache.stats()}")
+        user_cache.max_size = max_size
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the first requests after startup with the warm-up disabled and
+enabled: latency of the first and second request to each hot route, each
+run in a fresh interpreter.
+
+Run from the backend directory:
+    python -m tests.benchmarks.bench_warmup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+ROUTES = ["/api/v1/tasks", "/api/v1/priorities", "/api/v1/users/me"]
+
+SCRIPT = """
+import json, time
+from tests.benchmarks.harness import benchmark_client, login
+
+routes = %r
+timings = {}
+with benchmark_client() as client:
+    headers = login(client)
+    for route in routes:
+        samples = []
+        for _ in range(2):
+            start = time.perf_counter()
+            assert client.get(route, headers=headers).status_code == 200
+            samples.append(time.perf_counter() - start)
+        timings[route] = samples
+print(json.dumps(timings))
+"""
+
+
+def run(env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-c", SCRIPT % ROUTES], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for enabled in ("false", "true"):
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/warmup.db", LOG_LEVEL="WARNING",
+                       WARMUP_ENABLED=enabled)
+            runs = [run(env) for _ in range(RUNS)]
+            print(f"warm-up {'enabled' if enabled == 'true' else 'disabled'}:")
+            for route in ROUTES:
+                first = statistics.median(timings[route][0] for timings in runs)
+                second = statistics.median(timings[route][1] for timings in runs)
+                print(f"  {route:<24} first {first * 1000:7.2f} ms  second {second * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
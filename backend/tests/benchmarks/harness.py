@@ -0,0 +1,122 @@
+"""
+Shared helpers for the backend benchmarks.
+
+The benchmarks run the real application in-process against an in-memory
+SQLite database, so they measure Python-side overhead rather than network
+or disk latency.
+"""
+
+import statistics
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, List
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_db
+from app.core.rate_limit import rate_limit_policies
+from app.main import app
+from app.models import Priority
+
+
+def _bind_app_to_memory_database():
+    """Point the app's get_db at a fresh, seeded in-memory database"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    for name, weight in (("High", 3), ("Medium", 2), ("Low", 1)):
+        db.add(Priority(name=name, weight=weight))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Benchmarks issue far more requests than the default limits allow
+    for limiter in rate_limit_policies.limiters:
+        limiter.rate_limit = 10 ** 9
+
+    app.dependency_overrides[get_db] = override_get_db
+    return engine
+
+
+@contextmanager
+def benchmark_client():
+    """Yield a TestClient bound to a fresh in-memory database"""
+    engine = _bind_app_to_memory_database()
+    try:
+        with TestClient(app) as client:
+            client.engine = engine
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+@asynccontextmanager
+async def async_benchmark_client():
+    """
+    Yield an httpx.AsyncClient that calls the app on the current event loop,
+    so concurrent requests compete for the loop the way they do in uvicorn
+    """
+    engine = _bind_app_to_memory_database()
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+            client.engine = engine
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def login(client: TestClient, username: str = "benchuser", password: str = "Password123!") -> Dict[str, str]:
+    """Create a user and return authorization headers for it"""
+    client.post("/api/users", json={"username": username, "password": password})
+    response = client.post("/api/token", data={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def async_login(client: httpx.AsyncClient, username: str = "benchuser", password: str = "Password123!") -> Dict[str, str]:
+    """Create a user and return authorization headers for it"""
+    await client.post("/api/users", json={"username": username, "password": password})
+    response = await client.post("/api/token", data={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def summarise(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarise per-call latency samples (in seconds)"""
+    samples = sorted(samples)
+    return {
+        "ops_per_sec": len(samples) / elapsed,
+        "mean_ms": statistics.mean(samples) * 1000,
+        "p99_ms": samples[max(int(len(samples) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def measure(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """Call fn repeatedly and summarise per-call latency"""
+    samples: List[float] = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarise(samples, time.perf_counter() - start)
+
+
+def report(label: str, result: Dict[str, float]) -> None:
+    """Print one benchmark result line"""
+    print(f"{label:<40} {result['ops_per_sec']:>10.0f} ops/s"
+          f"  mean {result['mean_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
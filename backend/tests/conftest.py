@@ -19,6 +19,29 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Give every test fresh rate limit budgets"""
+    from app.core.rate_limit import rate_limit_policies
+    from app.core.rate_limit_backends import InMemoryBackend
+    
+    for limiter in rate_limit_policies.limiters:
+        limiter.backend = InMemoryBackend(limiter.time_window)
+
+@pytest.fixture(autouse=True)
+def reset_priority_cache():
+    """Do not serve priorities cached from another test's database"""
+    from app.api.priorities import priority_cache
+    
+    priority_cache.clear()
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(monkeypatch):
+    """Fail requests that run more SQL statements than their route's budget"""
+    from app.core import database
+    
+    monkeypatch.setattr(database, "QUERY_BUDGET_MODE", "raise")
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create tables for testing and drop after test is complete"""
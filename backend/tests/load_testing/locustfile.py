@@ -239,6 +239,33 @@ class HighVolumeTaskUser(HttpUser):
                               headers=self.headers)
 
 
+class LoginStormUser(HttpUser):
+    """
+    Simulates a burst of logins (e.g. after a deploy invalidates sessions).
+    Run alongside TaskManagerUser to check that task endpoint latency holds
+    while password hashing is under load.
+    """
+    wait_time = between(0.1, 0.3)
+    weight = 1
+
+    def on_start(self):
+        """Register the account that will be logged into repeatedly"""
+        self.username = f"storm_user_{random.randint(10000, 99999)}"
+        self.password = "LoginStorm123!"
+        self.client.post("/api/v1/users", json={
+            "username": self.username,
+            "password": self.password
+        })
+
+    @task
+    def login(self):
+        """Load test: Log in with valid credentials"""
+        self.client.post("/api/v1/token", data={
+            "username": self.username,
+            "password": self.password
+        }, name="/api/v1/token [storm]")
+
+
 # Custom load testing scenarios
 class StressTestScenario(HttpUser):
     """
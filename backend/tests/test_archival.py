@@ -0,0 +1,80 @@
+"""Tests for archiving completed tasks"""
+
+import time
+from datetime import datetime, timedelta
+
+from app.core.archival import archive_completed_tasks
+from app.models import ArchivedTask, ArchivedTaskDependency, Task, TaskDependency
+
+
+def test_old_completed_tasks_are_archived_and_stay_readable(client, db_session):
+    """Archival moves old completed tasks and their dependencies in batches; include_archived reads them"""
+    client.post("/api/users", json={"username": "archiveuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "archiveuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+    for title in ("Old done", "Also old done", "Recent done", "Open"):
+        client.post("/api/v1/tasks", json={"title": title, "priority_id": 1}, headers=headers)
+    client.post("/api/v1/tasks/1/dependencies", json={"task_id": 1, "dependent_task_id": 4}, headers=headers)
+
+    long_ago = datetime.utcnow() - timedelta(days=90)
+    for task in db_session.query(Task).filter(Task.id <= 3):
+        task.status = "completed"
+        task.updated_at = long_ago if task.id <= 2 else datetime.utcnow()
+    db_session.commit()
+
+    assert archive_completed_tasks(db_session.get_bind(), days=30, batch_size=1) == 2
+    db_session.expire_all()
+    assert [task.id for task in db_session.query(Task)] == [3, 4]
+    assert [task.id for task in db_session.query(ArchivedTask)] == [1, 2]
+    assert db_session.query(TaskDependency).count() == 0
+    assert db_session.query(ArchivedTaskDependency).one().dependent_task_id == 4
+
+    assert [task["id"] for task in client.get("/api/v1/tasks", headers=headers).json()] == [3, 4]
+    archived = client.get("/api/v1/tasks?include_archived=true", headers=headers).json()
+    assert [task["id"] for task in archived] == [3, 4, 1, 2]
+    assert archived[2]["priority"]["name"] == "High"
+    assert client.get("/api/v1/tasks/1", headers=headers).status_code == 404
+    assert client.get("/api/v1/tasks/1?include_archived=true", headers=headers).json()["title"] == "Old done"
+
+
+def test_updated_at_uses_the_archival_clock(client, db_session, monkeypatch):
+    """updated_at is written in UTC, like the archival cutoff, whatever the host's time zone"""
+    monkeypatch.setenv("TZ", "Etc/GMT-12")
+    time.tzset()
+    try:
+        client.post("/api/users", json={"username": "clockuser", "password": "Password123!"})
+        token = client.post("/api/token", data={"username": "clockuser", "password": "Password123!"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+        task_id = client.post("/api/v1/tasks", json={"title": "Done", "priority_id": 1}, headers=headers).json()["id"]
+        client.put(f"/api/v1/tasks/{task_id}", json={"status": "completed"}, headers=headers)
+
+        updated_at = db_session.get(Task, task_id).updated_at.replace(tzinfo=None)
+        assert abs(updated_at - datetime.utcnow()) < timedelta(minutes=5)
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+
+def test_tasks_reusing_an_archived_id_are_left_live(client, db_session):
+    """A task whose ID an older database reused from an archived task is skipped, not a failed batch"""
+    client.post("/api/users", json={"username": "reuseuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "reuseuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+    for title in ("Reused ID", "Done"):
+        client.post("/api/v1/tasks", json={"title": title, "priority_id": 1}, headers=headers)
+
+    long_ago = datetime.utcnow() - timedelta(days=90)
+    db_session.add(ArchivedTask(id=1, title="Archived earlier", status="completed", owner_id=1,
+                                created_at=long_ago, updated_at=long_ago))
+    for task in db_session.query(Task):
+        task.status = "completed"
+        task.updated_at = long_ago
+    db_session.commit()
+
+    assert archive_completed_tasks(db_session.get_bind(), days=30, batch_size=1) == 1
+    db_session.expire_all()
+    assert [task.id for task in db_session.query(Task)] == [1]
+    assert [task.title for task in db_session.query(ArchivedTask).order_by(ArchivedTask.id)] == ["Archived earlier", "Done"]
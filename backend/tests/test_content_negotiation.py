@@ -0,0 +1,54 @@
+"""Test MessagePack and CBOR content negotiation"""
+
+import pytest
+
+from app.core import responses
+from app.core.responses import negotiate_media_type
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def _setup_tasks(client):
+    client.post("/api/users", json={"username": "binaryuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "binaryuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "Urgent", "weight": 5}, headers=headers)
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}", "priority_id": 1,
+                                           "due_date": "2030-01-01T09:30:00"}, headers=headers)
+    return headers
+
+
+def test_negotiate_media_type():
+    """Test that JSON stays the default unless a binary type is preferred"""
+    assert negotiate_media_type(None) is None
+    assert negotiate_media_type("*/*") is None
+    assert negotiate_media_type("application/json, application/msgpack") is None
+    assert negotiate_media_type("application/msgpack") == "application/msgpack"
+    assert negotiate_media_type("application/json;q=0.5, application/x-msgpack") == "application/x-msgpack"
+
+
+def test_msgpack_matches_json(client, monkeypatch):
+    """Test that MessagePack bodies decode to the JSON bodies, on both task list paths"""
+    headers = _setup_tasks(client)
+    for fast in (False, True):
+        monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", fast)
+        for path in ("/api/v1/tasks", "/api/v1/tasks/1", "/api/v1/priorities", "/api/v1/priorities/1"):
+            expected = client.get(path, headers=headers).json()
+            response = client.get(path, headers={**headers, "Accept": "application/msgpack"})
+            assert response.headers["content-type"] == "application/msgpack"
+            assert response.headers["vary"] == "Accept"
+            assert msgpack.unpackb(response.content) == expected
+
+
+def test_cbor_matches_json(client, monkeypatch):
+    """Test that CBOR bodies decode to the JSON bodies, on both task list paths"""
+    cbor2 = pytest.importorskip("cbor2")
+    headers = _setup_tasks(client)
+    for fast in (False, True):
+        monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", fast)
+        for path in ("/api/v1/tasks", "/api/v1/tasks/1"):
+            expected = client.get(path, headers=headers).json()
+            response = client.get(path, headers={**headers, "Accept": "application/cbor"})
+            assert response.headers["content-type"] == "application/cbor"
+            assert cbor2.loads(response.content) == expected
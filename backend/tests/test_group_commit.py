@@ -0,0 +1,59 @@
+"""Tests for group commit of task writes"""
+
+import asyncio
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.core import group_commit
+from app.core.database import Base
+from app.core.group_commit import GroupCommitWriter
+from app.models import Priority
+
+
+def test_concurrent_writes_share_a_transaction_and_fail_alone():
+    """Writes submitted together commit in one batch; a failing write only fails its own request"""
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    commits = []
+
+    def insert(name):
+        def job(db):
+            if name == "Broken":
+                raise ValueError("bad write")
+            db.add(Priority(name=name, weight=1))
+            return name
+        return job
+
+    async def run():
+        writer = GroupCommitWriter(engine, window=0.01)
+        return await asyncio.gather(
+            *(writer.submit(insert(name)) for name in ("High", "Broken", "Medium", "Low")),
+            return_exceptions=True,
+        )
+
+    event.listen(engine, "commit", lambda connection: commits.append(1))
+    results = asyncio.run(run())
+
+    assert results[0] == "High" and results[2:] == ["Medium", "Low"]
+    assert isinstance(results[1], ValueError)
+    assert len(commits) == 1
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Priority.__table__)).scalar() == 3
+
+
+def test_task_writes_through_group_commit(client, monkeypatch):
+    """POST and PUT /tasks return the committed task, and errors reach the right request"""
+    monkeypatch.setattr(group_commit, "GROUP_COMMIT_ENABLED", True)
+    client.post("/api/users", json={"username": "groupuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "groupuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+
+    created = client.post("/api/v1/tasks", json={"title": "Grouped", "priority_id": 1}, headers=headers)
+    assert created.status_code == 201
+    assert created.json()["priority"]["name"] == "High"
+    updated = client.put(f"/api/v1/tasks/{created.json()['id']}", json={"status": "completed"}, headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["status"] == "completed"
+    assert client.get(f"/api/v1/tasks/{created.json()['id']}", headers=headers).json()["status"] == "completed"
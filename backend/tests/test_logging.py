@@ -0,0 +1,35 @@
+"""Test the queued application logging"""
+
+import json
+import logging
+import queue
+
+from app.core.logging_config import DeferredQueueHandler, JsonFormatter
+
+
+def test_queued_records_keep_exception_info():
+    """Test that records are formatted by the listener with their traceback"""
+    log_queue = queue.Queue(10)
+    test_logger = logging.getLogger("test_queued_logging")
+    test_logger.propagate = False
+    test_logger.addHandler(DeferredQueueHandler(log_queue))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        test_logger.exception("Request failed for %s", "alice")
+
+    record = log_queue.get_nowait()
+    formatted = json.loads(JsonFormatter().format(record))
+    assert formatted["message"] == "Request failed for alice"
+    assert "ValueError: boom" in formatted["exception"]
+
+
+def test_full_queue_drops_records():
+    """Test that a stalled listener does not make the queue grow"""
+    log_queue = queue.Queue(2)
+    handler = DeferredQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(logging.LogRecord("test", logging.INFO, __file__, 1, f"line {i}", None, None))
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 3
@@ -0,0 +1,41 @@
+"""Test the event loop lag monitor"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.core.loop_monitor import LoopLagMonitor, event_loop_blocked_total
+from app.core.request_context import RequestContext, active_requests
+
+
+def test_blocking_call_is_attributed_to_route():
+    """Test that a blocked loop is reported with the blocking stack and route"""
+    route = "/api/v1/blocking/{item_id}"
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+
+    def blocking_handler():
+        time.sleep(0.3)
+
+    async def serve_request():
+        task = asyncio.current_task()
+        scope = {"method": "GET", "path": "/api/v1/blocking/1", "route": SimpleNamespace(path=route)}
+        active_requests[task] = RequestContext("request-1", scope)
+        try:
+            blocking_handler()
+        finally:
+            del active_requests[task]
+
+    async def scenario():
+        monitor_task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(serve_request())
+        monitor_task.cancel()
+
+    before = event_loop_blocked_total.labels(route).value
+    asyncio.run(scenario())
+
+    assert event_loop_blocked_total.labels(route).value == before + 1
+    stall = monitor.stalls[-1]
+    assert stall["route"] == route
+    assert stall["request_id"] == "request-1"
+    assert "blocking_handler" in stall["stack"]
@@ -0,0 +1,36 @@
+"""Test the memory diagnostics endpoints"""
+
+import pytest
+
+from app.core import auth
+
+
+@pytest.fixture
+def admin_headers(client, monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_USERNAMES", {"memoryadmin"})
+    client.post("/api/users", json={"username": "memoryadmin", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "memoryadmin", "password": "Password123!"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_memory_report_shows_growth_by_module(client, admin_headers):
+    """Test that allocations made between snapshots are attributed to their module"""
+    assert client.get("/api/v1/admin/memory/report", headers=admin_headers).status_code == 409
+    assert client.post("/api/v1/admin/memory/start", headers=admin_headers).json() == {"tracing": True}
+    try:
+        retained = [bytearray(1024) for _ in range(1000)]
+        report = client.get("/api/v1/admin/memory/report", headers=admin_headers).json()
+    finally:
+        assert client.post("/api/v1/admin/memory/stop", headers=admin_headers).json() == {"tracing": False}
+
+    grown = [entry for entry in report["modules"] if entry["module"].endswith("test_memory")]
+    assert grown[0]["size_diff"] >= 1024 * 1000
+    assert len(retained) == 1000
+
+
+def test_memory_gauges_are_exported(client):
+    """Test that RSS and object count gauges are sampled at startup"""
+    text = client.get("/metrics").text
+    rss = [line for line in text.splitlines() if line.startswith("process_resident_memory_bytes ")]
+    assert float(rss[0].split()[1]) > 0
+    assert "python_gc_objects " in text
@@ -0,0 +1,76 @@
+"""Test the metrics endpoint"""
+
+import threading
+
+from app.core.metrics import Counter, Histogram, Registry, http_requests_total, record_request
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets render cumulatively with sum and count"""
+    registry = Registry()
+    histogram = Histogram("latency_seconds", "Latency", ("route",), registry=registry, buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.labels("/tasks").observe(value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/tasks",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/tasks",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/tasks",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{route="/tasks"} 6.05' in text
+    assert 'latency_seconds_count{route="/tasks"} 4' in text
+
+
+def test_updates_from_threads_are_not_lost():
+    """Test that metrics updated from executor threads count every update"""
+    registry = Registry()
+    counter = Counter("updates_total", "Updates", registry=registry)
+    histogram = Histogram("update_size", "Update sizes", registry=registry, buckets=(1.0,))
+
+    def update():
+        for _ in range(20000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=update) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.labels().value == 80000
+    assert histogram.labels().counts[0] == 80000
+
+
+def test_unknown_methods_share_one_label():
+    """Test that arbitrary request methods do not create new label series"""
+    for method in ("BREW", "X-SCAN-1", "X-SCAN-2"):
+        record_request(method, "unmatched", 405, 0.001, 0, 0.0)
+
+    recorded = {values[0] for values in http_requests_total._children}
+    assert "other" in recorded
+    assert not recorded & {"BREW", "X-SCAN-1", "X-SCAN-2"}
+
+
+def test_metrics_endpoint_reports_requests_and_statements(client):
+    """Test that requests are recorded per route template with their SQL statements"""
+    route = 'method="GET",route="/api/v1/tasks/{task_id}"'
+    before = client.get("/metrics").text
+    client.post("/api/users", json={"username": "metricsuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "metricsuser", "password": "Password123!"}).json()
+    client.get("/api/v1/tasks/42", headers={"Authorization": f"Bearer {token['access_token']}"})
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert (_sample(text, f"http_request_duration_seconds_count{{{route}}}")
+            == _sample(before, f"http_request_duration_seconds_count{{{route}}}") + 1)
+    assert _sample(text, f'http_requests_total{{{route},status="404"}}') >= 1
+    assert _sample(text, 'db_statements_per_request_sum{route="/api/v1/tasks/{task_id}"}') >= 1
+    assert "http_requests_in_flight 1.0" in text
+    assert 'cache_hit_ratio{cache="users"}' in text
@@ -0,0 +1,23 @@
+"""Test the request middleware"""
+
+from app.core.rate_limit import auth_rate_limiter
+
+
+def test_responses_carry_request_id_and_version(client):
+    """Test that API responses get a request ID and API version header"""
+    response = client.get("/api/v1/tasks")
+
+    assert response.headers["X-Request-ID"]
+    assert response.headers["X-API-Version"] == "v1"
+    assert "X-API-Version" not in client.get("/health").headers
+
+
+def test_rate_limited_requests_are_rejected(client):
+    """Test that requests over a policy's limit get a 429 with a request ID"""
+    for _ in range(auth_rate_limiter.rate_limit):
+        client.post("/api/token", data={"username": "nobody", "password": "wrong"})
+
+    response = client.post("/api/token", data={"username": "nobody", "password": "wrong"})
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Authentication rate limit exceeded"
+    assert response.headers["X-Request-ID"]
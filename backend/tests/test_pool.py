@@ -0,0 +1,43 @@
+"""Tests for connection pool configuration, metrics and readiness"""
+
+from app.core import database
+from app.core.database import get_engine, pool_status
+from app.core.metrics import render_metrics
+
+
+def test_pool_settings_and_exhaustion(tmp_path, monkeypatch):
+    """The pool uses the configured limits and reports when they are reached"""
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 0.05)
+    engine = get_engine(f"sqlite:///{tmp_path}/pool.db")
+    assert engine.pool.size() == 2
+    assert engine.pool._recycle == database.DB_POOL_RECYCLE
+
+    connections = [engine.connect() for _ in range(3)]
+    status = pool_status(engine)
+    assert status == {"size": 2, "checked_out": 3, "overflow": 1, "exhausted": True}
+
+    timeouts = database.db_pool_checkout_timeouts_total.labels().value
+    try:
+        engine.connect()
+    except database.exc.TimeoutError:
+        pass
+    assert database.db_pool_checkout_timeouts_total.labels().value == timeouts + 1
+
+    for connection in connections:
+        connection.close()
+    assert pool_status(engine)["exhausted"] is False
+    engine.dispose()
+
+
+def test_ready_fails_fast_when_pool_exhausted(client, monkeypatch):
+    """/ready answers 503 while every pooled connection is in use"""
+    assert client.get("/ready").status_code == 200
+    assert "db_pool_checked_out" in render_metrics()
+
+    exhausted = {"size": 5, "checked_out": 15, "overflow": 10, "exhausted": True}
+    monkeypatch.setattr("app.main.pool_status", lambda engine: exhausted)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "pool_exhausted", "pool": exhausted}
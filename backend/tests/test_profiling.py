@@ -0,0 +1,44 @@
+"""Test on-demand request profiling"""
+
+import pytest
+
+from app.core import auth, profiling
+
+
+@pytest.fixture
+def admin_headers(client, monkeypatch, tmp_path):
+    """Log in as a user listed in ADMIN_USERNAMES, writing profiles to a temporary directory"""
+    monkeypatch.setattr(auth, "ADMIN_USERNAMES", {"profileadmin"})
+    monkeypatch.setattr(profiling, "ADMIN_USERNAMES", {"profileadmin"})
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    for username in ("profileadmin", "profileuser"):
+        client.post("/api/users", json={"username": username, "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "profileadmin", "password": "Password123!"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_admin_can_profile_a_request(client, admin_headers):
+    """Test that a flagged admin request is profiled and the profile can be listed and downloaded"""
+    response = client.get("/api/v1/tasks?profile=1", headers=admin_headers)
+    profile_id = response.headers["X-Profile-ID"]
+
+    profiles = client.get("/api/v1/admin/profiles", headers=admin_headers).json()
+    assert [p["name"] for p in profiles] == [profile_id]
+    assert profiles[0]["method"] == "GET"
+    assert profiles[0]["path"] == "/api/v1/tasks"
+
+    download = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=admin_headers)
+    assert download.status_code == 200
+    for line in download.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+
+def test_non_admins_cannot_profile(client, admin_headers):
+    """Test that the profiling flag is ignored for non-admins and the listing is forbidden"""
+    token = client.post("/api/token", data={"username": "profileuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}", "X-Profile": "1"}
+
+    assert "X-Profile-ID" not in client.get("/api/v1/tasks", headers=headers).headers
+    assert client.get("/api/v1/admin/profiles", headers=headers).status_code == 403
+    assert client.get("/api/v1/admin/profiles", headers=admin_headers).json() == []
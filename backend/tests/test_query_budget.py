@@ -0,0 +1,64 @@
+"""Test SQL statement instrumentation and per-route query budgets"""
+
+import pytest
+
+from app.core import database
+from app.core.auth import user_cache
+from app.core.database import QueryBudgetExceeded
+
+
+def _setup_tasks(client):
+    client.post("/api/users", json={"username": "budgetuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "budgetuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    for name, weight in (("High", 3), ("Medium", 2), ("Low", 1)):
+        client.post("/api/priorities", json={"name": name, "weight": weight}, headers=headers)
+    for priority_id in (1, 2, 3):
+        client.post("/api/v1/tasks", json={"title": f"Task {priority_id}", "priority_id": priority_id},
+                    headers=headers)
+    for dependent_task_id in (2, 3):
+        client.post("/api/v1/tasks/1/dependencies", json={"task_id": 1, "dependent_task_id": dependent_task_id},
+                    headers=headers)
+    return headers
+
+
+def test_task_reads_stay_within_budget(client):
+    """Test that task reads load priorities without a query per task"""
+    headers = _setup_tasks(client)
+
+    assert len(client.get("/api/v1/tasks", headers=headers).json()) == 3
+    assert client.get("/api/v1/tasks/1", headers=headers).status_code == 200
+    assert len(client.get("/api/v1/tasks/2/dependencies", headers=headers).json()) == 1
+
+    # Archived tasks are one more statement, even when the user is not cached
+    user_cache.clear()
+    assert len(client.get("/api/v1/tasks", params={"include_archived": True}, headers=headers).json()) == 3
+    user_cache.clear()
+    assert client.get("/api/v1/tasks/99", params={"include_archived": True}, headers=headers).status_code == 404
+
+
+def test_over_budget_requests_fail_in_tests(client, monkeypatch):
+    """Test that exceeding a route's budget raises in raise mode"""
+    headers = _setup_tasks(client)
+    monkeypatch.setitem(database.ROUTE_QUERY_BUDGETS, "GET /tasks", 0)
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/v1/tasks", headers=headers)
+
+
+def test_over_budget_and_slow_queries_are_logged(client, monkeypatch):
+    """Test that warn mode logs over-budget requests and slow queries with their request ID"""
+    headers = _setup_tasks(client)
+    warnings = []
+    monkeypatch.setattr(database.app_logger, "warning", lambda message, extra: warnings.append((message, extra)))
+    monkeypatch.setattr(database, "QUERY_BUDGET_MODE", "warn")
+    monkeypatch.setattr(database, "SLOW_QUERY_SECONDS", 0.0)
+    monkeypatch.setitem(database.ROUTE_QUERY_BUDGETS, "GET /tasks/{task_id}", 0)
+
+    response = client.get("/api/v1/tasks/1", headers=headers)
+    assert response.status_code == 200
+    request_id = response.headers["X-Request-ID"]
+    assert any(m.startswith("Slow query") and "Parameters:" in m and e["request_id"] == request_id
+               for m, e in warnings)
+    assert any(m == "Query budget exceeded: GET /api/v1/tasks/{task_id} ran more than 0 statements"
+               for m, e in warnings)
@@ -0,0 +1,96 @@
+"""Test the GCRA rate limiter and rate limit policies"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+from app.core.auth import create_access_token
+from app.core.rate_limit import RateLimiter, RateLimitPolicies, RateLimitPolicy, rate_limit_policies
+
+
+def test_allows_burst_up_to_limit():
+    """Test that a client gets rate_limit requests per window and no more"""
+    limiter = RateLimiter(rate_limit=5, time_window=60)
+
+    assert all(limiter.allow("client", now=1000.0) for _ in range(5))
+    assert not limiter.allow("client", now=1000.0)
+    assert limiter.allow("other", now=1000.0)
+
+
+def test_budget_replenishes_over_time():
+    """Test that one request is regained per emission interval"""
+    limiter = RateLimiter(rate_limit=5, time_window=60)
+    for _ in range(5):
+        limiter.allow("client", now=1000.0)
+
+    assert not limiter.allow("client", now=1011.0)
+    assert limiter.allow("client", now=1012.0)
+    assert not limiter.allow("client", now=1012.0)
+
+
+def test_full_budget_from_non_round_time():
+    """Test that float drift in the TAT does not cost the last request of a window"""
+    for now in (123456.789, 98765.4321, time.monotonic()):
+        limiter = RateLimiter(rate_limit=100, time_window=60)
+        assert sum(limiter.allow("client", now=now) for _ in range(101)) == 100
+
+
+def test_idle_clients_are_expired():
+    """Test that the timing wheel drops clients once their budget is full again"""
+    limiter = RateLimiter(rate_limit=100, time_window=60)
+    for i in range(1000):
+        limiter.allow(f"client-{i}", now=1000.0)
+    assert limiter.backend.client_count == 1000
+
+    limiter.allow("late", now=1000.0 + 61)
+    assert limiter.backend.client_count == 1
+
+
+def test_long_idle_gap_expires_everything():
+    """Test expiry when more than a full wheel lap has passed"""
+    limiter = RateLimiter(rate_limit=2, time_window=60)
+    for _ in range(2):
+        limiter.allow("client", now=1000.0)
+
+    assert limiter.allow("client", now=5000.0)
+    assert limiter.backend.client_count == 1
+
+
+def _request(method, path, token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "method": method, "path": path, "headers": headers,
+            "query_string": b"", "client": ("10.0.0.1", 1234)}
+
+
+def test_route_groups_are_matched_once():
+    """Test that requests fall into the first matching route group"""
+    assert rate_limit_policies.match("POST", "/api/v1/token") == "auth"
+    assert rate_limit_policies.match("GET", "/api/auth/status") == "auth"
+    assert rate_limit_policies.match("PUT", "/api/v1/tasks/3") == "task_writes"
+    assert rate_limit_policies.match("GET", "/api/v1/tasks") == "api"
+    assert rate_limit_policies.match("GET", "/health") is None
+
+
+def test_policies_weight_requests_per_user():
+    """Test that user-scoped policies follow the user and apply costs"""
+    limiter = RateLimiter(rate_limit=6, time_window=60)
+    policies = RateLimitPolicies(
+        {"writes": [r"POST /api/tasks$"], "api": [r"[A-Z]+ /api/"]},
+        [RateLimitPolicy(limiter, ["writes"], scope="user", cost=3),
+         RateLimitPolicy(limiter, ["api"], scope="user")],
+    )
+    token = create_access_token({"sub": "policyuser"}, expires_delta=timedelta(minutes=5))
+
+    async def scenario():
+        results = [
+            await policies.check(_request("POST", "/api/tasks", token)),
+            await policies.check(_request("GET", "/api/tasks", token)),
+            await policies.check(_request("GET", "/api/tasks", token)),
+            await policies.check(_request("GET", "/api/tasks", token)),
+            await policies.check(_request("GET", "/api/tasks", token)),
+            await policies.check(_request("GET", "/api/tasks")),
+        ]
+        return [result is None for result in results]
+
+    # 3 + 1 + 1 + 1 uses the user's budget of 6; anonymous requests are keyed by IP
+    assert asyncio.run(scenario()) == [True, True, True, True, False, True]
@@ -0,0 +1,117 @@
+"""Test the shared rate limit backends"""
+
+import asyncio
+import multiprocessing
+import time
+
+from app.core.rate_limit import RateLimiter
+from app.core.rate_limit_backends import RedisBackend, SharedMemoryBackend
+
+
+def test_shared_memory_full_budget_at_wall_clock_time(tmp_path):
+    """Test that float drift at wall-clock magnitudes does not cost the last request of a window"""
+    backend = SharedMemoryBackend(str(tmp_path / "ratelimit"), slots=1024)
+    for i, now in enumerate((1760000123.456789, 1760000987.654321, time.time())):
+        limiter = RateLimiter(rate_limit=100, time_window=60, backend=backend, name=f"drift{i}")
+        assert sum(limiter.allow("client", now=now) for _ in range(101)) == 100
+
+
+def _hammer(path, results):
+    limiter = RateLimiter(rate_limit=50, time_window=60, backend=SharedMemoryBackend(path, slots=1024))
+    results.put(sum(limiter.allow("client") for _ in range(50)))
+
+
+def test_shared_memory_budget_is_shared_between_processes(tmp_path):
+    """Test that worker processes draw from one budget per client"""
+    path = str(tmp_path / "ratelimit")
+    SharedMemoryBackend(path, slots=1024)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_hammer, args=(path, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sum(results.get() for _ in workers) == 50
+
+
+class RedisStandIn:
+    """
+    Minimal server speaking the Redis protocol, implementing EVAL of the
+    GCRA script with the equivalent Python logic
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def handle(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            args = []
+            for _ in range(int(line[1:])):
+                length = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(length + 2))[:-2])
+            if args[0].upper() == b"EVAL":
+                key = args[3]
+                now, interval, window, tolerance = (float(arg) for arg in args[4:8])
+                tat = max(self.data.get(key, now), now)
+                allowed = tat + interval - now <= window + min(tolerance, interval / 2)
+                if allowed:
+                    self.data[key] = tat + interval
+                writer.write(b":%d\r\n" % allowed)
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def test_redis_backend_against_stand_in():
+    """Test that the Redis backend enforces the limit through the server"""
+    async def scenario():
+        stand_in = RedisStandIn()
+        server = await asyncio.start_server(stand_in.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        limiter = RateLimiter(rate_limit=5, time_window=60,
+                              backend=RedisBackend(f"redis://127.0.0.1:{port}/0"))
+        results = await asyncio.gather(*(limiter.check_rate_limit("client") for _ in range(7)))
+        server.close()
+        await server.wait_closed()
+        return results, stand_in.data
+
+    results, data = asyncio.run(scenario())
+    assert results.count(True) == 5
+    assert list(data) == [b"ratelimit:default:client"]
+
+
+def test_redis_backend_fails_open_when_unavailable():
+    """Test that requests are allowed while the server cannot be reached"""
+    async def scenario():
+        backend = RedisBackend("redis://127.0.0.1:1/0", retry_interval=60)
+        limiter = RateLimiter(rate_limit=1, time_window=60, backend=backend)
+        return [await limiter.check_rate_limit("client") for _ in range(3)]
+
+    start = time.monotonic()
+    assert asyncio.run(scenario()) == [True, True, True]
+    assert time.monotonic() - start < 5
+
+
+def test_redis_backend_fails_open_when_server_hangs():
+    """Test that requests are allowed, not held, while the server accepts but never answers"""
+    async def scenario():
+        async def never_reply(reader, writer):
+            await reader.read()
+
+        server = await asyncio.start_server(never_reply, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        backend = RedisBackend(f"redis://127.0.0.1:{port}/0", retry_interval=60, timeout=0.2)
+        limiter = RateLimiter(rate_limit=1, time_window=60, backend=backend)
+        results = await asyncio.gather(*(limiter.check_rate_limit("client") for _ in range(3)))
+        results.append(await limiter.check_rate_limit("client"))
+        server.close()
+        return results
+
+    start = time.monotonic()
+    assert asyncio.run(scenario()) == [True, True, True, True]
+    assert time.monotonic() - start < 2
@@ -0,0 +1,43 @@
+"""Tests for read replica routing, using separate primary and replica databases"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import database
+from app.core.database import Base, primary_sticky
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A second in-memory database standing in for a replica that has not caught up"""
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    primary_sticky.clear()
+    yield engine
+    primary_sticky.clear()
+    engine.dispose()
+
+
+def test_reads_use_replica_unless_user_wrote_recently(client, replica):
+    """Reads go to the replica, except right after the user's own write"""
+    client.post("/api/users", json={"username": "replicauser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "replicauser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+
+    response = client.post("/api/v1/tasks", json={"title": "Written to the primary", "priority_id": 1},
+                           headers=headers)
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    # Sticky to the primary: the user reads their own write
+    assert primary_sticky.get("replicauser") is True
+    assert [task["id"] for task in client.get("/api/v1/tasks", headers=headers).json()] == [task_id]
+
+    # Outside the window reads go to the replica, which has not seen the task
+    primary_sticky.clear()
+    assert client.get("/api/v1/tasks", headers=headers).json() == []
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=headers).status_code == 404
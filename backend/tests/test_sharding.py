@@ -0,0 +1,129 @@
+"""Tests for owner-based task sharding and shard rebalancing"""
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.pool import StaticPool
+
+from app.core import database
+from app.core.database import ShardRouter, create_shard_tables
+from app.models import ArchivedTask, ArchivedTaskDependency, Task, TaskDependency
+from scripts.rebalance_shards import IdCollision, find_misplaced_owners, move_owner_tasks, rebalance
+
+
+def _memory_engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # Enforce foreign keys, as PostgreSQL shards do
+    event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    create_shard_tables(engine)
+    return engine
+
+
+def _count(engine, table) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table)).scalar()
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    """Two in-memory task shards, enforcing foreign keys"""
+    router = ShardRouter()
+    for name in ("shard-a", "shard-b"):
+        router.add_shard(name, _memory_engine())
+    monkeypatch.setattr(database, "shard_router", router)
+    monkeypatch.setattr("app.api.priorities.shard_router", router)
+    yield router
+    for engine in router.engines.values():
+        engine.dispose()
+
+
+def test_adding_a_shard_only_moves_owners_to_it():
+    """Consistent hashing moves about 1/N of the owners, all to the new shard"""
+    router = ShardRouter()
+    router.add_shard("shard-a", None)
+    router.add_shard("shard-b", None)
+    before = {owner_id: router.shard_for(owner_id) for owner_id in range(1, 3001)}
+    router.add_shard("shard-c", None)
+    moved = [owner_id for owner_id, shard in before.items() if router.shard_for(owner_id) != shard]
+
+    assert all(router.shard_for(owner_id) == "shard-c" for owner_id in moved)
+    assert 0.2 < len(moved) / len(before) < 0.45
+
+
+def test_tasks_live_on_owner_shard_and_can_be_moved(shards, client):
+    """Tasks are written to the owner's shard, and rebalancing moves them with their dependencies"""
+    user = client.post("/api/users", json={"username": "sharduser", "password": "Password123!"}).json()
+    token = client.post("/api/token", data={"username": "sharduser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=headers)
+    for title in ("First", "Second"):
+        assert client.post("/api/v1/tasks", json={"title": title, "priority_id": 1}, headers=headers).status_code == 201
+    client.post("/api/v1/tasks/1/dependencies", json={"task_id": 1, "dependent_task_id": 2}, headers=headers)
+
+    home = shards.shard_for(user["id"])
+    other = next(name for name in shards.engines if name != home)
+    assert _count(shards.engines[home], Task.__table__) == 2
+    assert _count(shards.engines[other], Task.__table__) == 0
+
+    # Misplace the user's tasks, then let the rebalancer move them back
+    move_owner_tasks(user["id"], shards.engines[home], shards.engines[other])
+    assert find_misplaced_owners(shards) == [(user["id"], other, home)]
+    rebalance(shards)
+    assert find_misplaced_owners(shards) == []
+    assert _count(shards.engines[other], Task.__table__) == 0
+    assert _count(shards.engines[home], TaskDependency.__table__) == 1
+
+    assert [task["title"] for task in client.get("/api/v1/tasks", headers=headers).json()] == ["First", "Second"]
+    assert [task["id"] for task in client.get("/api/v1/tasks/2/dependencies", headers=headers).json()] == [1]
+
+
+def test_move_refuses_id_collisions_and_skips_dangling_dependencies(shards):
+    """Colliding IDs block the move unless renumbering is allowed; stale copies are replaced, not duplicated"""
+    source, target = shards.engines["shard-a"], shards.engines["shard-b"]
+    with source.begin() as connection:
+        connection.execute(insert(Task.__table__), [
+            {"id": 1, "title": "Mine", "owner_id": 7}, {"id": 2, "title": "Also mine", "owner_id": 7},
+            {"id": 3, "title": "Not mine", "owner_id": 8},
+        ])
+        connection.execute(insert(TaskDependency.__table__), [
+            {"task_id": 1, "dependent_task_id": 2}, {"task_id": 1, "dependent_task_id": 3},
+        ])
+    with target.begin() as connection:
+        # Another user's task with a colliding ID, and a copy left by an interrupted move
+        connection.execute(insert(Task.__table__), [
+            {"id": 2, "title": "Someone else's", "owner_id": 9}, {"id": 1, "title": "Mine", "owner_id": 7},
+        ])
+
+    with pytest.raises(IdCollision):
+        move_owner_tasks(7, source, target)
+    assert _count(source, Task.__table__) == 3
+    assert _count(target, Task.__table__) == 2
+
+    id_map, skipped = move_owner_tasks(7, source, target, allow_renumber=True)
+    assert id_map == {1: 1, 2: 3}
+    assert skipped == [(1, 3)]
+    with target.connect() as connection:
+        rows = connection.execute(select(Task.id, Task.owner_id).order_by(Task.id)).all()
+        edges = connection.execute(select(TaskDependency.task_id, TaskDependency.dependent_task_id)).all()
+    assert [tuple(row) for row in rows] == [(1, 7), (2, 9), (3, 7)]
+    assert [tuple(edge) for edge in edges] == [(1, 3)]
+    assert _count(source, Task.__table__) == 1
+    assert _count(source, TaskDependency.__table__) == 0
+
+
+def test_move_takes_archived_tasks_along(shards):
+    """Archived tasks and their dependencies move with the user, and the target's next task ID skips them"""
+    source, target = shards.engines["shard-a"], shards.engines["shard-b"]
+    with source.begin() as connection:
+        connection.execute(insert(Task.__table__), [{"id": 1, "title": "Live", "owner_id": 7}])
+        connection.execute(insert(ArchivedTask.__table__), [{"id": 5, "title": "Archived", "owner_id": 7}])
+        connection.execute(insert(ArchivedTaskDependency.__table__), [{"task_id": 5, "dependent_task_id": 1}])
+
+    id_map, skipped = move_owner_tasks(7, source, target)
+    assert id_map == {1: 1, 5: 5} and skipped == []
+    assert _count(source, ArchivedTask.__table__) == 0
+    assert _count(source, ArchivedTaskDependency.__table__) == 0
+    assert _count(target, ArchivedTask.__table__) == 1
+    assert _count(target, ArchivedTaskDependency.__table__) == 1
+    with target.begin() as connection:
+        new_id = connection.execute(insert(Task.__table__).values(title="New", owner_id=7)).inserted_primary_key[0]
+    assert new_id == 6
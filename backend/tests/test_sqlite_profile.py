@@ -0,0 +1,30 @@
+"""Tests for the SQLite performance profile"""
+
+from sqlalchemy import text
+
+from app.core.database import Base, RoutingSession, create_engines
+from app.models import Priority
+
+
+def test_performance_profile_routes_writes_to_writer(tmp_path):
+    """Connections get the profile's pragmas and writes go to the writer engine"""
+    engine, writer = create_engines(f"sqlite:///{tmp_path}/profile.db", sqlite_performance=True)
+    Base.metadata.create_all(bind=writer)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+    session = RoutingSession(bind=engine, writer=writer)
+    assert session.get_bind() is engine
+    session.add(Priority(name="High", weight=3))
+    session.flush()
+    # The transaction has written, so it reads from the writer and sees its own insert
+    assert session.get_bind() is writer
+    assert session.query(Priority).count() == 1
+    session.commit()
+    assert session.get_bind() is engine
+    assert session.query(Priority).count() == 1
+    session.close()
+
+    assert create_engines(f"sqlite:///{tmp_path}/plain.db", sqlite_performance=False)[1] is None
+    assert create_engines("sqlite:///:memory:", sqlite_performance=True)[1] is None
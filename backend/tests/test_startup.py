@@ -0,0 +1,34 @@
+"""Tests for the startup database connection check"""
+
+import asyncio
+
+import pytest
+
+from app.core import database
+
+
+def test_connect_with_retry_backs_off_until_connected(monkeypatch):
+    """Failed connection attempts are retried with a growing delay"""
+    attempts = []
+    delays = []
+
+    def check_connection(engine):
+        attempts.append(engine)
+        if len(attempts) < 3:
+            raise ConnectionError("database is starting")
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(database, "_check_connection", check_connection)
+    monkeypatch.setattr(database.asyncio, "sleep", sleep)
+    asyncio.run(database.connect_with_retry(database.engine, max_retries=5, initial_delay=0.5, max_delay=0.75))
+
+    assert len(attempts) == 3
+    assert delays == [0.5, 0.75]
+
+    attempts.clear()
+    monkeypatch.setattr(database, "_check_connection", lambda engine: attempts.append(engine) or 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(database.connect_with_retry(database.engine, max_retries=2, initial_delay=0))
+    assert len(attempts) == 2
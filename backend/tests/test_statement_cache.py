@@ -0,0 +1,34 @@
+"""Test that the cached task statements bind each call's parameters"""
+
+
+def _login(client, username):
+    client.post("/api/users", json={"username": username, "password": "Password123!"})
+    token = client.post("/api/token", data={"username": username, "password": "Password123!"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_cached_statements_use_each_calls_parameters(client):
+    """Repeated lookups with different IDs, owners and filters return the matching rows"""
+    alice, bob = _login(client, "alice"), _login(client, "bob")
+    client.post("/api/priorities", json={"name": "High", "weight": 3}, headers=alice)
+    client.post("/api/priorities", json={"name": "Low", "weight": 1}, headers=alice)
+    first = client.post("/api/v1/tasks", json={"title": "First", "priority_id": 1}, headers=alice).json()
+    second = client.post("/api/v1/tasks", json={"title": "Second", "priority_id": 2}, headers=alice).json()
+    client.put(f"/api/v1/tasks/{second['id']}", json={"status": "completed"}, headers=alice)
+
+    assert client.get(f"/api/v1/tasks/{first['id']}", headers=alice).json()["title"] == "First"
+    assert client.get(f"/api/v1/tasks/{second['id']}", headers=alice).json()["title"] == "Second"
+    assert client.get(f"/api/v1/tasks/{first['id']}", headers=bob).status_code == 404
+    assert [t["title"] for t in client.get("/api/v1/tasks", params={"status": "open"}, headers=alice).json()] == ["First"]
+    assert [t["title"] for t in client.get("/api/v1/tasks", params={"status": "completed"}, headers=alice).json()] == ["Second"]
+    assert [t["title"] for t in client.get("/api/v1/tasks", params={"priority_id": 2}, headers=alice).json()] == ["Second"]
+    assert client.get("/api/v1/tasks", headers=bob).json() == []
+    assert client.post("/api/v1/tasks", json={"title": "Bad", "priority_id": 99}, headers=alice).status_code == 404
+
+    dependency = {"task_id": first["id"], "dependent_task_id": second["id"]}
+    assert client.post(f"/api/v1/tasks/{first['id']}/dependencies", json=dependency, headers=alice).status_code == 201
+    assert client.post(f"/api/v1/tasks/{first['id']}/dependencies", json=dependency, headers=alice).status_code == 400
+    assert [t["id"] for t in client.get(f"/api/v1/tasks/{second['id']}/dependencies", headers=alice).json()] == [first["id"]]
+    assert client.get(f"/api/v1/tasks/{first['id']}/dependencies", headers=alice).json() == []
+    assert client.delete(f"/api/v1/tasks/{first['id']}/dependencies/{second['id']}", headers=alice).status_code == 204
+    assert client.get(f"/api/v1/tasks/{second['id']}/dependencies", headers=alice).json() == []
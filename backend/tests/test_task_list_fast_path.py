@@ -0,0 +1,21 @@
+"""Test the row-based fast path of the task list endpoint"""
+
+from app.core import responses
+
+
+def test_fast_path_matches_regular_response(client, monkeypatch):
+    """Test that the fast path returns the same JSON as the ORM path"""
+    client.post("/api/users", json={"username": "listuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "listuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.post("/api/priorities", json={"name": "Urgent", "weight": 5}, headers=headers)
+    for i in range(3):
+        client.post("/api/v1/tasks", json={
+            "title": f"Task {i}", "priority_id": 1, "due_date": "2030-01-0%dT09:30:00" % (i + 1),
+        }, headers=headers)
+
+    for params in ({}, {"status": "open"}, {"priority_id": 1}):
+        monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", False)
+        expected = client.get("/api/v1/tasks", params=params, headers=headers).json()
+        monkeypatch.setattr(responses, "FAST_JSON_RESPONSES", True)
+        assert client.get("/api/v1/tasks", params=params, headers=headers).json() == expected
@@ -0,0 +1,39 @@
+"""Test the verified-token cache used when decoding access tokens"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.core.auth import (
+    _token_digest,
+    create_access_token,
+    decode_access_token,
+    invalidate_cached_token,
+    token_cache,
+)
+
+
+def test_repeat_decode_is_served_from_cache():
+    """Test that a token is only verified once while it is valid"""
+    token_cache.clear()
+    token = create_access_token({"sub": "cacheuser"}, expires_delta=timedelta(minutes=5))
+
+    assert decode_access_token(token)["sub"] == "cacheuser"
+    assert decode_access_token(token)["sub"] == "cacheuser"
+    assert token_cache.stats()["hits"] == 1
+
+    invalidate_cached_token(token)
+    decode_access_token(token)
+    assert token_cache.stats()["misses"] == 2
+
+
+def test_cached_claims_honour_expiry():
+    """Test that an expired token is rejected even if its claims are cached"""
+    token_cache.clear()
+    token = create_access_token({"sub": "cacheuser"}, expires_delta=timedelta(seconds=-1))
+    token_cache.set(_token_digest(token), {"sub": "cacheuser", "exp": time.time() - 1})
+
+    with pytest.raises(JWTError):
+        decode_access_token(token)
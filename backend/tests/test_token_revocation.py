@@ -0,0 +1,103 @@
+"""Test refresh tokens and token revocation"""
+
+from datetime import datetime
+
+from jose import jwt
+
+from app.core.revocation import BloomFilter, RevocationList
+from app.models import RevokedToken
+
+
+def _login(client, username="revokeuser", password="Password123!"):
+    client.post("/api/users", json={"username": username, "password": password})
+    return client.post("/api/token", data={"username": username, "password": password}).json()
+
+
+def test_login_returns_refresh_token(client):
+    """Test that login issues a refresh token that cannot authenticate requests"""
+    tokens = _login(client)
+
+    assert tokens["refresh_token"]
+    response = client.get("/api/users/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 401
+
+
+def test_refresh_rotates_refresh_token(client):
+    """Test that a refresh token can only be exchanged once"""
+    tokens = _login(client)
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    new_tokens = response.json()
+    headers = {"Authorization": f"Bearer {new_tokens['access_token']}"}
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_tokens(client):
+    """Test that a logged out access token and its refresh token are rejected"""
+    tokens = _login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    response = client.post("/api/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 204
+
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_revocation_list_lookups():
+    """Test the set and Bloom filter revocation lookups"""
+    revocations = RevocationList()
+    revocations.add("revoked")
+    assert revocations.is_revoked("revoked")
+    assert not revocations.is_revoked("active")
+    assert not revocations.is_revoked(None)
+
+    bloom = BloomFilter(size_bits=1024)
+    bloom.add("revoked")
+    assert "revoked" in bloom
+    assert "active" not in bloom
+
+
+def test_sync_keeps_revocations_added_during_the_query(db_session):
+    """Test that a token revoked locally while a sync queries the database stays revoked, in both modes"""
+    db_session.add(RevokedToken(jti="stored", expires_at=datetime(2999, 1, 1)))
+    db_session.commit()
+
+    for revocations in (RevocationList(), RevocationList(use_bloom_filter=True, bloom_bits=1024)):
+        query = db_session.query
+
+        def query_then_revoke(*entities):
+            # Revoked by a request on another thread after the query ran
+            result = query(*entities)
+            revocations.add("local")
+            return result
+
+        db_session.query = query_then_revoke
+        try:
+            revocations.sync(db_session)
+        finally:
+            del db_session.query
+        assert revocations.is_revoked("stored")
+        assert revocations.is_revoked("local")
+        assert len(revocations) == 2
+
+
+def test_refresh_token_revoked_elsewhere_is_rejected(client, db_session):
+    """Test that a refresh token exchanged by another worker is refused, not a server error"""
+    tokens = _login(client)
+    claims = jwt.get_unverified_claims(tokens["refresh_token"])
+    # Revoked in the database only, as by another worker before its next sync
+    db_session.add(RevokedToken(jti=claims["jti"], expires_at=datetime.utcfromtimestamp(claims["exp"])))
+    db_session.commit()
+
+    response = client.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    response = client.post("/api/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 204
@@ -0,0 +1,64 @@
+"""Test the user cache used by the authentication dependency"""
+
+import time
+
+from app.core.auth import user_cache
+from app.core.cache import TTLCache
+
+
+def _login(client, username="cacheuser", password="Password123!"):
+    client.post("/api/users", json={"username": username, "password": password})
+    response = client.post("/api/token", data={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the cache stays bounded and evicts the oldest entry"""
+    cache = TTLCache("test_lru", max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries are not served after their time-to-live"""
+    cache = TTLCache("test_ttl", max_size=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hit_rate"] == 0.0
+
+
+def test_authenticated_requests_hit_user_cache(client):
+    """Test that repeat requests resolve the user from the cache"""
+    user_cache.clear()
+    headers = _login(client)
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    stats = user_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_update_user_invalidates_cache(client):
+    """Test that updating the user is visible on the next request"""
+    user_cache.clear()
+    headers = _login(client)
+    client.get("/api/users/me", headers=headers)
+
+    response = client.put("/api/users/me", json={"email": "cached@example.com"}, headers=headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/users/me", headers=headers)
+    assert response.json()["email"] == "cached@example.com"
@@ -0,0 +1,28 @@
+"""Tests for the startup warm-up and readiness endpoint"""
+
+from app.api.priorities import priority_cache
+
+
+def test_ready_after_warmup(client):
+    """The warm-up runs during startup, fills the priority cache and reports readiness"""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["warmup"]["complete"] is True
+    assert data["warmup"]["errors"] == []
+    assert set(data["warmup"]["steps"]) == {"connections", "schemas", "requests"}
+    assert priority_cache.get("all") is not None
+
+
+def test_priority_cache_invalidated_on_create(client):
+    """A new priority is listed straight away"""
+    client.post("/api/users", json={"username": "warmupuser", "password": "Password123!"})
+    token = client.post("/api/token", data={"username": "warmupuser", "password": "Password123!"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    before = client.get("/api/v1/priorities", headers=headers).json()
+    response = client.post("/api/v1/priorities", json={"name": "Urgent", "weight": 4}, headers=headers)
+    assert response.status_code == 201
+    after = client.get("/api/v1/priorities", headers=headers).json()
+    assert len(after) == len(before) + 1
+    assert "Urgent" in {priority["name"] for priority in after}